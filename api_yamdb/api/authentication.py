@@ -0,0 +1,100 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.cache import get_versions
+
+ROLE_CLAIMS = ('role', 'is_staff', 'is_superuser')
+
+
+def user_resource(user_id):
+    return f'user:{user_id}'
+
+
+def get_token_for_user(user):
+    """Access-токен с ролью и флагами администратора в claims."""
+    token = AccessToken.for_user(user)
+    for claim in ROLE_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class UserCache:
+    """
+    Ограниченный кэш пользователей в памяти процесса (TTL + LRU).
+    Запись действительна, пока не изменился общий счётчик версии
+    пользователя, который увеличивается сигналами CustomUser.
+    Вместе с пользователем хранятся наборы claims из токенов,
+    уже сверенные с БД. Кэш хранит и отдаёт копии: запросы в потоках
+    gthread не видят изменений экземпляра, сделанных другим запросом
+    (например, PATCH users/me/ до save()).
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, user_id, version, claims):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires, cached_version, checked_claims = entry
+            if expires < time.monotonic() or cached_version != version:
+                del self.entries[user_id]
+                return None
+            if claims not in checked_claims:
+                return None
+            self.entries.move_to_end(user_id)
+        return copy.deepcopy(user)
+
+    def set(self, user, version, claims):
+        user = copy.deepcopy(user)
+        with self.lock:
+            entry = self.entries.get(user.pk)
+            checked_claims = {claims}
+            if entry is not None and entry[2] == version:
+                checked_claims |= entry[3]
+            self.entries[user.pk] = (
+                user, time.monotonic() + self.ttl, version, checked_claims)
+            self.entries.move_to_end(user.pk)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса к БД в типичном случае.
+    Пользователь берётся из user_cache. Токен с ролью или флагами,
+    которые ещё не сверялись с закэшированной записью,
+    приводит к однократному чтению пользователя из БД.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        claims = tuple(validated_token.get(claim) for claim in ROLE_CLAIMS)
+        version, = get_versions(user_resource(user_id))
+        user = user_cache.get(user_id, version, claims)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user, version, claims)
+        return user
@@ -0,0 +1,148 @@
+import fcntl
+import hashlib
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = 'api:version:{}'
+MODIFIED_KEY = 'api:modified:{}'
+RESPONSE_KEY = 'api:response:{}:{}:{}'
+FILE_BASED_CACHE = 'django.core.cache.backends.filebased.FileBasedCache'
+VERSION_LOCK_FILE = 'versions.lock'
+
+stats = Counter()
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def new_version():
+    """
+    Начальное значение счётчика.
+    Берётся из текущего времени, поэтому после вытеснения ключа
+    версия не может совпасть с одной из прежних.
+    """
+    return int(time.time() * 1000)
+
+
+@contextmanager
+def file_cache_lock(alias, name):
+    """
+    Блокировка read-modify-write над кэшем alias между процессами
+    и потоками. incr, add и пара get+set у FileBasedCache выполняются
+    без блокировки; у остальных бэкендов блокировка не нужна
+    (incr и add атомарны) и не берётся.
+    """
+    config = settings.CACHES[alias]
+    if config['BACKEND'] != FILE_BASED_CACHE:
+        yield
+        return
+    os.makedirs(config['LOCATION'], exist_ok=True)
+    with open(os.path.join(config['LOCATION'], name), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def version_lock():
+    """
+    Без блокировки два параллельных bump_version получили бы одну
+    версию, и сброс кэша одного из них потерялся бы.
+    """
+    return file_cache_lock(settings.API_CACHE_ALIAS, VERSION_LOCK_FILE)
+
+
+def get_versions(*resources):
+    """Текущие версии ресурсов; отсутствующие счётчики создаются."""
+    cache = get_cache()
+    keys = [VERSION_KEY.format(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        with version_lock():
+            for key in missing:
+                version = new_version()
+                if not cache.add(key, version, timeout=None):
+                    version = cache.get(key, version)
+                versions[key] = version
+    return [versions[key] for key in keys]
+
+
+def bump_version(*resources):
+    """
+    Сброс закэшированных ответов ресурсов за O(1) на каждый ресурс.
+    Возвращает новые версии; None - если счётчик был создан заново.
+    """
+    cache = get_cache()
+    versions = []
+    with version_lock():
+        for resource in resources:
+            key = VERSION_KEY.format(resource)
+            try:
+                versions.append(cache.incr(key))
+            except ValueError:
+                cache.set(key, new_version(), timeout=None)
+                versions.append(None)
+    now = int(time.time())
+    cache.set_many(
+        {MODIFIED_KEY.format(resource): now for resource in resources},
+        timeout=None
+    )
+    return versions
+
+
+def bump_version_on_commit(*resources):
+    """
+    bump_version после фиксации текущей транзакции (вне транзакции - сразу).
+    Иначе параллельный запрос успел бы закэшировать под новой версией
+    ещё не зафиксированные, то есть старые данные.
+    """
+    transaction.on_commit(lambda: bump_version(*resources))
+
+
+def get_validators(*resources):
+    """
+    Версии и время последнего изменения ресурсов одним обращением к кэшу.
+    Используются для ETag и Last-Modified без сериализации ответа.
+    """
+    cache = get_cache()
+    version_keys = [VERSION_KEY.format(resource) for resource in resources]
+    modified_keys = [MODIFIED_KEY.format(resource) for resource in resources]
+    values = cache.get_many(version_keys + modified_keys)
+    if len(values) < len(version_keys) + len(modified_keys):
+        versions = get_versions(*resources)
+        now = int(time.time())
+        for key in modified_keys:
+            if key not in values:
+                cache.add(key, now, timeout=None)
+                values[key] = now
+    else:
+        versions = [values[key] for key in version_keys]
+    return versions, max(values[key] for key in modified_keys)
+
+
+def response_cache_key(resources, request):
+    versions = '.'.join(str(version) for version in get_versions(*resources))
+    path = hashlib.md5(
+        request.get_full_path().encode('utf-8')).hexdigest()
+    return RESPONSE_KEY.format('-'.join(resources), versions, path)
+
+
+def get_response_data(key):
+    data = get_cache().get(key)
+    stats['hits' if data is not None else 'misses'] += 1
+    return data
+
+
+def set_response_data(key, data):
+    get_cache().set(key, data, timeout=settings.API_CACHE_TIMEOUT)
+
+
+def get_stats():
+    """Счётчики попаданий и промахов кэша ответов в текущем процессе."""
+    return {'hits': stats['hits'], 'misses': stats['misses']}
@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+import zlib
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from api.registry import catalog_registry
+from reviews.models import Comment, Review
+from titles.models import Title
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+CSV_COLUMNS = (
+    'record', 'id', 'title_id', 'review_id', 'name', 'year', 'description',
+    'category', 'genre', 'rating', 'author', 'score', 'text', 'pub_date',
+)
+
+date_field = serializers.DateTimeField()
+
+
+def iter_chunks(chunk_size):
+    """
+    Произведения пачками по возрастанию id.
+    Каждая пачка - отдельный запрос по условию id > последнего,
+    поэтому память и длительность запросов не зависят от размера каталога.
+    """
+    last_id = 0
+    while True:
+        chunk = list(
+            Title.objects.filter(pk__gt=last_id).order_by('pk').values(
+                'id', 'name', 'year', 'description', 'category_id', 'rating'
+            )[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]['id']
+
+
+def load_chunk(chunk):
+    """Жанры, отзывы и комментарии пачки произведений - тремя запросами."""
+    title_ids = [title['id'] for title in chunk]
+    genres = defaultdict(list)
+    for title_id, genre_id in Title.genre.through.objects.filter(
+            title_id__in=title_ids).order_by('-genre_id').values_list(
+            'title_id', 'genre_id'):
+        genres[title_id].append(catalog_registry.genre(genre_id))
+    comments = defaultdict(list)
+    for review_id, *values in Comment.objects.filter(
+            review__title_id__in=title_ids).order_by(
+            'pub_date', 'id').values_list(
+            'review_id', 'id', 'author__username', 'text', 'pub_date'):
+        comments[review_id].append(dict(zip(
+            ('id', 'author', 'text', 'pub_date'), values)))
+    reviews = defaultdict(list)
+    for title_id, *values in Review.objects.filter(
+            title_id__in=title_ids).order_by('pub_date', 'id').values_list(
+            'title_id', 'id', 'author__username', 'text', 'score',
+            'pub_date'):
+        review = dict(zip(('id', 'author', 'text', 'score', 'pub_date'),
+                          values))
+        review['comments'] = comments[review['id']]
+        reviews[title_id].append(review)
+    for title in chunk:
+        yield {
+            'id': title['id'],
+            'name': title['name'],
+            'year': title['year'],
+            'rating': title['rating'],
+            'description': title['description'],
+            'genre': genres[title['id']],
+            'category': catalog_registry.category(title['category_id']),
+            'reviews': reviews[title['id']],
+        }
+
+
+def iter_titles(chunk_size=500):
+    """Все произведения каталога с жанрами, категорией и отзывами."""
+    catalog_registry.ensure_current()
+    for chunk in iter_chunks(chunk_size):
+        yield from load_chunk(chunk)
+
+
+def format_date(value):
+    """Дата в том же формате, что и в ответах API."""
+    return date_field.to_representation(value)
+
+
+def ndjson_lines(titles):
+    for title in titles:
+        for review in title['reviews']:
+            review['pub_date'] = format_date(review['pub_date'])
+            for comment in review['comments']:
+                comment['pub_date'] = format_date(comment['pub_date'])
+        yield json.dumps(title, ensure_ascii=False) + '\n'
+
+
+def csv_lines(titles):
+    """
+    Плоский CSV: строка на произведение, отзыв и комментарий.
+    Тип строки - в колонке record, связи - в title_id и review_id.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_COLUMNS)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writeheader()
+    yield flush()
+    for title in titles:
+        writer.writerow({
+            'record': 'title',
+            'id': title['id'],
+            'name': title['name'],
+            'year': title['year'],
+            'description': title['description'],
+            'category': (title['category'] or {}).get('slug'),
+            'genre': ','.join(genre['slug'] for genre in title['genre']),
+            'rating': title['rating'],
+        })
+        for review in title['reviews']:
+            writer.writerow({
+                'record': 'review',
+                'id': review['id'],
+                'title_id': title['id'],
+                'author': review['author'],
+                'score': review['score'],
+                'text': review['text'],
+                'pub_date': format_date(review['pub_date']),
+            })
+            for comment in review['comments']:
+                writer.writerow({
+                    'record': 'comment',
+                    'id': comment['id'],
+                    'title_id': title['id'],
+                    'review_id': review['id'],
+                    'author': comment['author'],
+                    'text': comment['text'],
+                    'pub_date': format_date(comment['pub_date']),
+                })
+        yield flush()
+
+
+def gzip_stream(chunks):
+    """Сжатие потока строк в формат gzip по мере генерации."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Разрешает ли заголовок Accept-Encoding ответ в gzip.
+    Учитываются q-значения: gzip;q=0 - явный отказ; * задаёт значение
+    для кодировок, не перечисленных явно.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def export_catalog(export_format, chunk_size=500, compress=False):
+    """Поток байтов выгрузки каталога в формате export_format."""
+    render = ndjson_lines if export_format == 'ndjson' else csv_lines
+    lines = render(iter_titles(chunk_size))
+    if compress:
+        return gzip_stream(lines)
+    return (line.encode('utf-8') for line in lines)
@@ -0,0 +1,84 @@
+from rest_framework import relations, serializers
+
+from api.registry import catalog_registry
+from api.serializers import RegistryGenreField
+from titles.models import Title
+
+
+class UnsupportedField(Exception):
+    """Поле сериализатора нельзя вывести из строки values()."""
+
+
+class FieldPlan:
+    """
+    Заранее вычисленный вывод полей сериализатора из строк values().
+    Для каждого поля хранятся колонка и to_representation самого поля DRF,
+    поэтому результат совпадает с выводом сериализатора.
+    """
+
+    def __init__(self, serializer):
+        self.fields = []
+        self.columns = ['pk']
+        self.genre_field = None
+        for name, field in serializer.fields.items():
+            if isinstance(field, RegistryGenreField):
+                self.genre_field = name
+                self.fields.append((name, None, None))
+                continue
+            if (isinstance(field, (serializers.BaseSerializer,
+                                   relations.ManyRelatedField,
+                                   serializers.SerializerMethodField))
+                    or field.source == '*' or '.' in field.source):
+                raise UnsupportedField(name)
+            if isinstance(field, relations.SlugRelatedField):
+                column = f'{field.source}__{field.slug_field}'
+                convert = None
+            elif isinstance(field, relations.PrimaryKeyRelatedField):
+                column, convert = field.source, None
+            else:
+                column, convert = field.source, field.to_representation
+            self.fields.append((name, column, convert))
+            self.columns.append(column)
+
+    def get_genres(self, rows):
+        """id жанров произведений страницы в порядке модели Genre."""
+        genres = {}
+        for title_id, genre_id in Title.genre.through.objects.filter(
+                title_id__in=[row['pk'] for row in rows]).order_by(
+                '-genre_id').values_list('title_id', 'genre_id'):
+            genres.setdefault(title_id, []).append(
+                catalog_registry.genre(genre_id))
+        return genres
+
+    def render(self, rows):
+        genres = self.get_genres(rows) if self.genre_field else {}
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in self.fields:
+                if column is None:
+                    item[name] = genres.get(row['pk'], [])
+                    continue
+                value = row[column]
+                if value is not None and convert is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+
+plans = {}
+
+
+def get_plan(serializer):
+    """
+    План для класса сериализатора и набора его полей (с учётом ?fields=).
+    None, если сериализатор содержит неподдерживаемые поля.
+    """
+    key = (type(serializer), tuple(serializer.fields))
+    if key not in plans:
+        try:
+            plans[key] = FieldPlan(serializer)
+        except UnsupportedField:
+            plans[key] = None
+    return plans[key]
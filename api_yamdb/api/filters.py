@@ -1,20 +1,90 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django.db.models import Count
+from django_filters.rest_framework import CharFilter, ChoiceFilter, FilterSet
+from rest_framework.filters import OrderingFilter
 from titles.models import Title
 
+from api.registry import catalog_registry
+from api.search import get_search_backend
+
+GENRE_MODES = ('any', 'all')
+
 
 class TitleFilter(FilterSet):
     """Кастомная фильтрация по модели Title."""
     category = CharFilter(
-        field_name='category__slug',
+        field_name='category',
+        method='filter_category'
     )
     genre = CharFilter(
-        field_name='genre__slug',
+        field_name='genre',
+        method='filter_genre'
+    )
+    genre_mode = ChoiceFilter(
+        choices=[(mode, mode) for mode in GENRE_MODES],
+        method='filter_genre_mode'
     )
     name = CharFilter(
         field_name='name',
-        lookup_expr='contains'
+        method='search_name'
     )
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'genre_mode', 'name', 'year')
+
+    def search_name(self, queryset, name, value):
+        """Поиск с ранжированием и учётом опечаток."""
+        return get_search_backend().search(queryset, value)
+
+    def filter_category(self, queryset, name, value):
+        """Slug переводится в id без JOIN с таблицей категорий."""
+        category_id = catalog_registry.category_id(value)
+        if category_id is None:
+            return queryset.none()
+        return queryset.filter(category_id=category_id)
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Один или несколько slug через запятую; ?genre_mode=any (по умолчанию)
+        - произведения с любым из жанров, all - со всеми.
+        Фильтр - один подзапрос к таблице связей без JOIN на каждый жанр:
+        для all связи группируются по произведению с HAVING COUNT = n.
+        """
+        mode = self.form.cleaned_data.get('genre_mode') or 'any'
+        slugs = list(dict.fromkeys(
+            slug.strip() for slug in value.split(',') if slug.strip()))
+        genre_ids = [catalog_registry.genre_id(slug) for slug in slugs]
+        if mode == 'all' and None in genre_ids:
+            return queryset.none()
+        genre_ids = [genre_id for genre_id in genre_ids if genre_id]
+        if not genre_ids:
+            return queryset.none()
+        if len(genre_ids) == 1:
+            return queryset.filter(genre=genre_ids[0])
+        links = Title.genre.through.objects.filter(genre_id__in=genre_ids)
+        if mode == 'all':
+            links = links.values('title_id').annotate(
+                matched=Count('genre_id')).filter(matched=len(genre_ids))
+        return queryset.filter(pk__in=links.values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        """Режим учитывается в filter_genre."""
+        return queryset
+
+
+class AliasOrderingFilter(OrderingFilter):
+    """
+    ?ordering= с именами полей ответа, которые отличаются от полей модели:
+    view.ordering_aliases - {поле ответа: поле модели}.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        aliases = getattr(view, 'ordering_aliases', {})
+        return [
+            ('-' if term.startswith('-') else '')
+            + aliases.get(term.lstrip('-'), term.lstrip('-'))
+            for term in ordering
+        ]
@@ -0,0 +1,380 @@
+import fcntl
+import glob
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from rest_framework import serializers
+
+from api.cache import get_stats
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TOTALS = (
+    ('db_queries_total', 'Количество SQL-запросов.'),
+    ('db_query_duration_seconds_total', 'Время выполнения SQL-запросов.'),
+    ('serializer_duration_seconds_total',
+     'Время сериализации ответа (включая запросы при ленивой загрузке).'),
+    ('response_size_bytes_total', 'Суммарный размер тел ответов.'),
+)
+PREFIX = 'yamdb_'
+# Снимки работающих процессов и сумма снимков завершившихся.
+SNAPSHOT_RE = re.compile(r'metrics-(\d+)-\d+\.json$')
+EXITED_FILE = 'metrics-exited.json'
+LOCK_FILE = 'metrics.lock'
+
+local = threading.local()
+logger = logging.getLogger(__name__)
+
+
+class RequestState:
+    """Замеры одного запроса: SQL и сериализация."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.in_serializer = False
+
+    def record_query(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - started
+
+
+def empty_metrics():
+    """Счётчики запросов, гистограммы времени, суммы и обращения к кэшу."""
+    return (
+        defaultdict(int),
+        defaultdict(lambda: [0] * (len(BUCKETS) + 1) + [0.0]),
+        defaultdict(float),
+        defaultdict(int),
+    )
+
+
+def add_snapshot(metrics, data):
+    """Прибавление снимка из файла к счётчикам empty_metrics()."""
+    requests, latency, totals, cache = metrics
+    for *key, value in data['requests']:
+        requests[tuple(key)] += value
+    for *key, values in data['latency']:
+        merged = latency[tuple(key)]
+        for index, value in enumerate(values):
+            merged[index] += value
+    for *key, value in data['totals']:
+        totals[tuple(key)] += value
+    for name, value in data['cache'].items():
+        cache[name] += value
+
+
+def to_snapshot(metrics):
+    requests, latency, totals, cache = metrics
+    return {
+        'requests': [[*key, value] for key, value in requests.items()],
+        'latency': [[*key, value] for key, value in latency.items()],
+        'totals': [[*key, value] for key, value in totals.items()],
+        'cache': dict(cache),
+    }
+
+
+def read_snapshot(path):
+    try:
+        with open(path) as metrics_file:
+            return json.load(metrics_file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshot(path, data):
+    """
+    Атомарная запись через временный файл с уникальным именем:
+    параллельные записи не подменяют временные файлы друг друга.
+    """
+    descriptor, temporary = tempfile.mkstemp(
+        prefix=f'{os.path.basename(path)}.', suffix='.tmp',
+        dir=os.path.dirname(path))
+    try:
+        with os.fdopen(descriptor, 'w') as metrics_file:
+            json.dump(data, metrics_file)
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class ProcessMetrics:
+    """
+    Метрики текущего процесса.
+    Периодически сохраняются в отдельный файл в METRICS_DIR, поэтому
+    /metrics любого воркера gunicorn отдаёт сумму по всем процессам.
+    Файлы завершившихся процессов объединяются в EXITED_FILE при сборе.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pid = None
+        self.reset()
+
+    def reset(self):
+        self.requests, self.latency, self.totals, _ = empty_metrics()
+        self.flushed = 0.0
+        self.path = None
+
+    def ensure_process(self):
+        """
+        После fork (в том числе с preload) у воркера свой файл,
+        а унаследованные от мастера значения сбрасываются.
+        """
+        if self.pid != os.getpid():
+            self.reset()
+            self.pid = os.getpid()
+            self.path = os.path.join(
+                settings.METRICS_DIR,
+                f'metrics-{self.pid}-{int(time.time() * 1000)}.json')
+
+    def observe(self, route, method, status, elapsed, state, size):
+        with self.lock:
+            self.ensure_process()
+            self.requests[route, method, status] += 1
+            latency = self.latency[route, method]
+            for index, bound in enumerate(BUCKETS):
+                if elapsed <= bound:
+                    break
+            else:
+                index = len(BUCKETS)
+            latency[index] += 1
+            latency[-1] += elapsed
+            for name, value in zip(
+                    (name for name, _ in TOTALS),
+                    (state.queries, state.query_time,
+                     state.serializer_time, size)):
+                self.totals[name, route, method] += value
+            due = time.monotonic() - self.flushed >= (
+                settings.METRICS_FLUSH_INTERVAL)
+        if due and self.flush_lock.acquire(blocking=False):
+            # Снимок уже записывает другой поток; ошибка записи метрик
+            # не должна превращать ответ на запрос в 500.
+            try:
+                self.write()
+            except OSError:
+                logger.exception('Не удалось сохранить метрики процесса')
+            finally:
+                self.flush_lock.release()
+
+    def snapshot(self):
+        with self.lock:
+            self.ensure_process()
+            return to_snapshot(
+                (self.requests, self.latency, self.totals, get_stats()))
+
+    def flush(self):
+        """Атомарная запись снимка метрик процесса в его файл."""
+        with self.flush_lock:
+            self.write()
+
+    def write(self):
+        """
+        Снимок и запись выполняются под flush_lock, поэтому более старый
+        снимок не заменит в файле более новый.
+        """
+        data = self.snapshot()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        write_snapshot(self.path, data)
+        self.flushed = time.monotonic()
+
+
+process_metrics = ProcessMetrics()
+
+
+def process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def exited_snapshots():
+    """Файлы снимков процессов, которые уже завершились."""
+    exited = []
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+        match = SNAPSHOT_RE.search(os.path.basename(path))
+        if match and not process_exists(int(match.group(1))):
+            exited.append(path)
+    return exited
+
+
+def merge_exited():
+    """
+    Снимки завершившихся процессов прибавляются к EXITED_FILE и удаляются,
+    чтобы число файлов не росло с каждым перезапуском воркеров.
+    Объединение выполняется под блокировкой файла: параллельный сбор
+    в другом воркере не учтёт один снимок дважды.
+    """
+    exited = exited_snapshots()
+    if not exited:
+        return
+    exited_path = os.path.join(settings.METRICS_DIR, EXITED_FILE)
+    with open(os.path.join(settings.METRICS_DIR, LOCK_FILE), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        metrics = empty_metrics()
+        merged = False
+        for path in exited:
+            data = read_snapshot(path)
+            if data is not None:
+                add_snapshot(metrics, data)
+                merged = True
+        if merged:
+            data = read_snapshot(exited_path)
+            if data is not None:
+                add_snapshot(metrics, data)
+            write_snapshot(exited_path, to_snapshot(metrics))
+        for path in exited:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def collect():
+    """Сумма снимков всех процессов, включая завершившиеся."""
+    process_metrics.flush()
+    merge_exited()
+    metrics = empty_metrics()
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+        data = read_snapshot(path)
+        if data is not None:
+            add_snapshot(metrics, data)
+    return metrics
+
+
+def labels(**values):
+    return '{' + ','.join(
+        '{}="{}"'.format(
+            name, str(value).replace('\\', r'\\').replace('"', r'\"'))
+        for name, value in values.items()
+    ) + '}'
+
+
+def render(requests, latency, totals, cache):
+    """Текстовый формат экспозиции Prometheus."""
+    lines = [
+        f'# HELP {PREFIX}http_requests_total Количество запросов.',
+        f'# TYPE {PREFIX}http_requests_total counter',
+    ]
+    for (route, method, status), value in sorted(requests.items()):
+        lines.append(f'{PREFIX}http_requests_total'
+                     f'{labels(route=route, method=method, status=status)} '
+                     f'{value}')
+    lines += [
+        f'# HELP {PREFIX}http_request_duration_seconds Время ответа.',
+        f'# TYPE {PREFIX}http_request_duration_seconds histogram',
+    ]
+    for (route, method), values in sorted(latency.items()):
+        cumulative = 0
+        for bound, value in zip(BUCKETS + ('+Inf',), values):
+            cumulative += value
+            lines.append(
+                f'{PREFIX}http_request_duration_seconds_bucket'
+                f'{labels(route=route, method=method, le=bound)} '
+                f'{cumulative}')
+        lines.append(f'{PREFIX}http_request_duration_seconds_sum'
+                     f'{labels(route=route, method=method)} {values[-1]}')
+        lines.append(f'{PREFIX}http_request_duration_seconds_count'
+                     f'{labels(route=route, method=method)} {cumulative}')
+    for name, description in TOTALS:
+        lines += [f'# HELP {PREFIX}{name} {description}',
+                  f'# TYPE {PREFIX}{name} counter']
+        for (metric, route, method), value in sorted(totals.items()):
+            if metric == name:
+                lines.append(f'{PREFIX}{name}'
+                             f'{labels(route=route, method=method)} {value}')
+    for name in ('hits', 'misses'):
+        lines += [
+            f'# HELP {PREFIX}api_cache_{name}_total '
+            f'Обращения к кэшу ответов API ({name}).',
+            f'# TYPE {PREFIX}api_cache_{name}_total counter',
+            f'{PREFIX}api_cache_{name}_total {cache[name]}',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Метрики всех процессов для Prometheus."""
+    return HttpResponse(
+        render(*collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class MetricsMiddleware:
+    """
+    Время ответа, количество и время SQL-запросов, время сериализации
+    и размер ответа по имени маршрута и методу запроса.
+    SQL-запросы учитываются через connection.execute_wrapper.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState()
+        local.state = state
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(state.record_query):
+                response = self.get_response(request)
+        finally:
+            local.state = None
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        process_metrics.observe(
+            match.view_name if match else 'unmatched',
+            request.method,
+            response.status_code,
+            elapsed,
+            state,
+            0 if response.streaming else len(response.content),
+        )
+        return response
+
+
+def instrument_serializers():
+    """
+    Замер времени BaseSerializer.data для MetricsMiddleware.
+    Учитывается только внешний сериализатор ответа.
+    """
+    original = serializers.BaseSerializer.data.fget
+    if getattr(original, 'instrumented', False):
+        return
+
+    def data(self):
+        state = getattr(local, 'state', None)
+        if state is None or state.in_serializer:
+            return original(self)
+        state.in_serializer = True
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            state.serializer_time += time.perf_counter() - started
+            state.in_serializer = False
+
+    data.instrumented = True
+    serializers.BaseSerializer.data = property(data)
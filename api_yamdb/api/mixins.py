@@ -1,4 +1,18 @@
-from rest_framework import mixins, viewsets
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+
+from api import cache
+from api.fastpath import get_plan
 
 
 class CreateListDestroyViewSet(mixins.CreateModelMixin,
@@ -7,3 +21,222 @@ class CreateListDestroyViewSet(mixins.CreateModelMixin,
                                viewsets.GenericViewSet):
     """Кастомный миксин для создания и удаления объектов, получения списка."""
     pass
+
+
+class CachedListMixin:
+    """
+    Кэширование списка для анонимных GET-запросов.
+    Ключ включает полный query string и версии ресурсов из cache_resources,
+    которые увеличиваются сигналами при изменении данных.
+    """
+    cache_resources = ()
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        key = cache.response_cache_key(self.cache_resources, request)
+        data = cache.get_response_data(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set_response_data(key, response.data)
+            response['X-Cache'] = 'MISS'
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для list и retrieve.
+    Валидаторы вычисляются по счётчикам версий из get_etag_resources(),
+    поэтому ответ 304 отдаётся до выборки данных и работы сериализатора.
+    """
+    etag_resources = ()
+
+    def get_etag_resources(self):
+        return self.etag_resources
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        resources = self.get_etag_resources()
+        versions, last_modified = cache.get_validators(*resources)
+        etag = quote_etag(hashlib.md5('|'.join((
+            *resources,
+            *(str(version) for version in versions),
+            request.accepted_renderer.format,
+            request.get_full_path(),
+        )).encode('utf-8')).hexdigest())
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    Выборочные поля ответа GET-запросов: ?fields=a,b и ?omit=c.
+    Сериализатор с SparseFieldsSerializerMixin отбрасывает лишние поля,
+    а sparse_queryset() читает из БД только нужные для оставшихся полей
+    колонки и не выполняет ненужные prefetch_related.
+    """
+    # Поле ответа -> колонки модели, которые нужны для его вывода.
+    sparse_columns = {}
+    # Колонки, которые читаются всегда (например, для пагинации).
+    sparse_required = ()
+    # Поля ответа, для которых нужен prefetch_related запроса.
+    sparse_prefetch = ()
+
+    def get_sparse_columns(self):
+        return self.sparse_columns
+
+    def parse_sparse_param(self, name):
+        value = self.request.query_params.get(name, '')
+        names = {item.strip() for item in value.split(',') if item.strip()}
+        unknown = names - set(self.get_sparse_columns())
+        if unknown:
+            raise ValidationError({name: [
+                f'Неизвестные поля: {", ".join(sorted(unknown))}.']})
+        return names
+
+    def get_sparse_fields(self):
+        """Поля ответа или None, если выборка полей не запрошена."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = None
+            if self.request.method == 'GET':
+                fields = self.parse_sparse_param('fields')
+                omit = self.parse_sparse_param('omit')
+                if fields or omit:
+                    self._sparse_fields = (
+                        fields or set(self.get_sparse_columns())) - omit
+        return self._sparse_fields
+
+    def sparse_queryset(self, queryset):
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        columns = list(self.sparse_required)
+        for name in fields:
+            columns.extend(self.get_sparse_columns()[name])
+        related = {column.rsplit('__', 1)[0]
+                   for column in columns if '__' in column}
+        # Внешний ключ связи из select_related не может быть отложен.
+        columns.extend(related)
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        if not fields & set(self.sparse_prefetch):
+            queryset = queryset.prefetch_related(None)
+        return queryset.only(*columns or ('pk',))
+
+
+class FastListMixin:
+    """
+    Быстрый путь list при settings.API_FAST_LIST: строки values() выводятся
+    по плану полей сериализатора (api.fastpath) без создания моделей.
+    Ответ совпадает с ответом сериализатора побайтно.
+    """
+
+    def list(self, request, *args, **kwargs):
+        plan = settings.API_FAST_LIST and get_plan(self.get_serializer())
+        if not plan:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.prefetch_related(None).values(
+            *plan.columns, *getattr(self, 'sparse_required', ()))
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(plan.render(list(rows)))
+        return self.get_paginated_response(plan.render(page))
+
+
+class BatchCreateMixin:
+    """
+    Пакетное создание: POST <ресурс>/batch/ со списком объектов.
+    Каждый элемент проверяется сериализатором get_batch_serializer_class()
+    без запросов к БД; проверки, требующие БД, выполняются одним запросом
+    на весь пакет в validate_batch(). Ошибки возвращаются списком
+    той же длины, что и запрос. Пакет сохраняется в одной транзакции.
+    """
+    batch_max_size = 1000
+    # Версии кэша, сбрасываемые после пакетной вставки:
+    # bulk_create не отправляет сигналы моделей.
+    batch_resources = ()
+
+    def get_batch_serializer_class(self):
+        return self.get_serializer_class()
+
+    def get_batch_serializer(self, *args, **kwargs):
+        """Сериализатор элемента без UniqueValidator на полях."""
+        serializer = self.get_batch_serializer_class()(
+            *args, context=self.get_serializer_context(), **kwargs)
+        for field in serializer.fields.values():
+            field.validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return serializer
+
+    def validate_batch(self, items, errors):
+        """Проверки пакета целиком; дополняет errors по индексам."""
+
+    def perform_batch_create(self, items):
+        """
+        Сохранение проверенных элементов; возвращает данные ответа.
+        По умолчанию - bulk_create модели сериализатора get_serializer_class()
+        и сброс версий batch_resources после фиксации транзакции.
+        """
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+        objects = model.objects.bulk_create(model(**item) for item in items)
+        cache.bump_version_on_commit(*self.batch_resources)
+        return serializer_class(
+            objects, many=True, context=self.get_serializer_context()).data
+
+    def validate_unique_slugs(self, model, items, errors):
+        """Уникальность slug в пакете и в БД одним запросом."""
+        slugs = [item['slug'] for item in items if item is not None]
+        existing = set(model.objects.filter(
+            slug__in=slugs).values_list('slug', flat=True))
+        seen = set()
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+            if item['slug'] in existing or item['slug'] in seen:
+                errors[index].setdefault('slug', []).append(
+                    f'{model._meta.verbose_name} со slug '
+                    f'"{item["slug"]}" уже существует.')
+            seen.add(item['slug'])
+
+    @action(detail=False, methods=('post',), url_path='batch')
+    def batch(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Ожидается список объектов.']})
+        if len(request.data) > self.batch_max_size:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'Не больше {self.batch_max_size} объектов в пакете.']})
+        items = []
+        errors = []
+        for data in request.data:
+            serializer = self.get_batch_serializer(data=data)
+            valid = serializer.is_valid()
+            items.append(serializer.validated_data if valid else None)
+            errors.append({} if valid else dict(serializer.errors))
+        self.validate_batch(items, errors)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            data = self.perform_batch_create(items)
+        return Response(data, status=status.HTTP_201_CREATED)
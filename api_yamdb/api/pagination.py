@@ -0,0 +1,143 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Keyset-пагинация по паре (pub_date, id).
+    Страница выбирается условием по ключу последней записи,
+    поэтому её стоимость не зависит от глубины и не требует COUNT(*).
+    Порядок задаётся ключом, поэтому параметр ordering отклоняется.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    position_field = 'pub_date'
+    invalid_cursor_message = 'Неверный курсор.'
+    ordering_message = ('Сортировка недоступна при пагинации по курсору: '
+                        'записи упорядочены по pub_date и id.')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if api_settings.ORDERING_PARAM in request.query_params:
+            raise ValidationError(
+                {api_settings.ORDERING_PARAM: [self.ordering_message]})
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        reverse, position = self.decode_cursor(request)
+        field = self.position_field
+        if position is not None:
+            value, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__lt': value})
+                    | Q(**{field: value, 'pk__lt': pk}))
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__gt': value})
+                    | Q(**{field: value, 'pk__gt': pk}))
+        ordering = (f'-{field}', '-pk') if reverse else (field, 'pk')
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+        self.page = results
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        """Разбор курсора вида base64('r=<0|1>&p=<pub_date>&i=<id>')."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            value = parse_datetime(tokens['p'][0])
+            pk = int(tokens['i'][0])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, (value, pk)
+
+    def encode_cursor(self, instance, reverse):
+        """Курсор по модели или по строке values() с ключом pk."""
+        if isinstance(instance, dict):
+            position, pk = instance[self.position_field], instance['pk']
+        else:
+            position, pk = getattr(instance, self.position_field), instance.pk
+        tokens = {'p': position.isoformat(), 'i': str(pk)}
+        if reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+
+class PageNumberOrKeysetPagination(pagination.BasePagination):
+    """
+    Постраничная пагинация по умолчанию.
+    Keyset-режим включается параметром ?pagination=cursor
+    или наличием параметра cursor в запросе.
+    """
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (request.query_params.get(self.mode_query_param)
+                == self.keyset_mode
+                or KeysetPagination.cursor_query_param
+                in request.query_params):
+            self.paginator = KeysetPagination()
+        else:
+            self.paginator = pagination.PageNumberPagination()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
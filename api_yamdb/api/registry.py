@@ -0,0 +1,93 @@
+import threading
+
+from django.db import router
+
+from api.cache import get_versions
+from titles.models import Category, Genre
+
+
+class CatalogRegistry:
+    """
+    Категории и жанры в памяти процесса: slug -> id и id -> представление.
+    Таблицы маленькие и почти не меняются, поэтому загружаются целиком.
+    Актуальность проверяется по общим счётчикам версий categories и genres
+    (одно обращение к кэшу), которые увеличиваются сигналами моделей.
+    ensure_current() вызывается один раз на запрос (TitleViewSet.initial)
+    или выгрузку; поиск по справочнику - чтение словарей без обращения
+    к кэшу.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.category_ids = {}
+        self.genre_ids = {}
+        self.categories = {}
+        self.genres = {}
+
+    def ensure_current(self):
+        version = tuple(get_versions('categories', 'genres'))
+        if version == self.version:
+            return
+        with self.lock:
+            if version == self.version:
+                return
+            categories = {
+                pk: {'name': name, 'slug': slug}
+                for pk, name, slug in
+                Category.objects.values_list('pk', 'name', 'slug')
+            }
+            genres = {
+                pk: {'name': name, 'slug': slug}
+                for pk, name, slug in
+                Genre.objects.values_list('pk', 'name', 'slug')
+            }
+            self.category_ids = {
+                value['slug']: pk for pk, value in categories.items()}
+            self.genre_ids = {
+                value['slug']: pk for pk, value in genres.items()}
+            self.categories, self.genres = categories, genres
+            self.version = version
+
+    def ensure_loaded(self):
+        """Загрузка при первом обращении вне запроса (shell, команды)."""
+        if self.version is None:
+            self.ensure_current()
+
+    def category_id(self, slug):
+        self.ensure_loaded()
+        return self.category_ids.get(slug)
+
+    def genre_id(self, slug):
+        self.ensure_loaded()
+        return self.genre_ids.get(slug)
+
+    def category(self, pk):
+        """Представление категории как у CategorySerializer."""
+        self.ensure_loaded()
+        return self.categories.get(pk)
+
+    def genre(self, pk):
+        """Представление жанра как у GenreSerializer."""
+        self.ensure_loaded()
+        return self.genres.get(pk)
+
+    def get_object(self, model, slug):
+        """
+        Экземпляр Category или Genre по slug, как если бы он был прочитан
+        из БД. Достаточен для внешнего ключа и связей many-to-many.
+        """
+        self.ensure_loaded()
+        if model is Category:
+            ids, values = self.category_ids, self.categories
+        else:
+            ids, values = self.genre_ids, self.genres
+        pk = ids.get(slug)
+        if pk is None:
+            return None
+        return model.from_db(
+            router.db_for_read(model), ('id', 'name', 'slug'),
+            (pk, values[pk]['name'], slug))
+
+
+catalog_registry = CatalogRegistry()
@@ -0,0 +1,151 @@
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramSimilarity)
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, When
+from django.utils.module_loading import import_string
+
+from api.cache import get_versions
+from titles.models import Title
+
+SEARCH_RESOURCE = 'title-search'
+WORD_RE = re.compile(r'\w+')
+
+
+def trigrams(text):
+    """Триграммы слов текста, как в pg_trgm: слово дополняется пробелами."""
+    result = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        result.update(
+            padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class PostgresSearchBackend:
+    """
+    Полнотекстовый поиск по tsvector с ранжированием
+    и устойчивостью к опечаткам за счёт триграмм pg_trgm.
+    Оба условия обслуживаются GIN-индексами из миграции titles.0003.
+    """
+
+    def search(self, queryset, value):
+        config = settings.TITLE_SEARCH_CONFIG
+        query = SearchQuery(value, config=config)
+        return queryset.annotate(
+            search_vector=SearchVector('name', config=config),
+            search_rank=SearchRank(
+                SearchVector('name', config=config), query),
+            similarity=TrigramSimilarity('name', value),
+        ).filter(
+            Q(search_vector=query) | Q(name__trigram_similar=value)
+        ).order_by('-search_rank', '-similarity', '-id')
+
+
+class InvertedIndex:
+    """
+    Инвертированный индекс триграмм названий произведений в памяти процесса.
+    Строится при первом поиске и обновляется сигналами сохранения
+    и удаления Title. Изменения из других процессов обнаруживаются
+    по общему счётчику версии, после чего индекс перестраивается.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = None
+        self.postings = defaultdict(set)
+        self.names = {}
+
+    def build(self, version):
+        postings = defaultdict(set)
+        names = {}
+        for pk, name in Title.objects.values_list('pk', 'name').iterator():
+            names[pk] = trigrams(name)
+            for trigram in names[pk]:
+                postings[trigram].add(pk)
+        self.postings, self.names, self.version = postings, names, version
+
+    def ensure_current(self):
+        version, = get_versions(SEARCH_RESOURCE)
+        with self.lock:
+            if version != self.version:
+                self.build(version)
+
+    def remove(self, pk):
+        with self.lock:
+            for trigram in self.names.pop(pk, ()):
+                self.postings[trigram].discard(pk)
+                if not self.postings[trigram]:
+                    del self.postings[trigram]
+
+    def update(self, pk, name, new_version):
+        """
+        Обновление записи после увеличения счётчика до new_version.
+        Если счётчик успел измениться в другом процессе,
+        индекс остаётся устаревшим и перестроится при следующем поиске.
+        """
+        with self.lock:
+            if self.version is None:
+                return
+            self.remove(pk)
+            if name is not None:
+                self.names[pk] = trigrams(name)
+                for trigram in self.names[pk]:
+                    self.postings[trigram].add(pk)
+            if new_version is not None and new_version == self.version + 1:
+                self.version = new_version
+
+    def search(self, value, threshold, limit):
+        """
+        id произведений по убыванию релевантности.
+        Основная оценка - доля триграмм запроса, найденных в названии,
+        при равенстве выше названия с большим сходством целиком.
+        """
+        query = trigrams(value)
+        if not query:
+            return []
+        self.ensure_current()
+        with self.lock:
+            matches = defaultdict(int)
+            for trigram in query:
+                for pk in self.postings.get(trigram, ()):
+                    matches[pk] += 1
+            scored = []
+            for pk, common in matches.items():
+                coverage = common / len(query)
+                if coverage < threshold:
+                    continue
+                similarity = common / (
+                    len(query) + len(self.names[pk]) - common)
+                scored.append((-coverage, -similarity, -pk))
+        scored.sort()
+        return [-pk for _, _, pk in scored[:limit]]
+
+
+title_index = InvertedIndex()
+
+
+class InMemorySearchBackend:
+    """Поиск по индексу в памяти для СУБД без pg_trgm (SQLite в тестах)."""
+    threshold = 0.5
+    limit = 1000
+
+    def search(self, queryset, value):
+        ids = title_index.search(value, self.threshold, self.limit)
+        return queryset.filter(pk__in=ids).order_by(Case(
+            *(When(pk=pk, then=position) for position, pk in enumerate(ids)),
+            output_field=IntegerField()
+        )) if ids else queryset.none()
+
+
+def get_search_backend():
+    """Бэкенд из настройки TITLE_SEARCH_BACKEND или по типу СУБД."""
+    if settings.TITLE_SEARCH_BACKEND:
+        return import_string(settings.TITLE_SEARCH_BACKEND)()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return InMemorySearchBackend()
@@ -1,12 +1,27 @@
-from django.shortcuts import get_object_or_404
+from django.conf import settings
 from django.utils import timezone
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.validators import UniqueValidator
 from reviews.models import Comment, Review
-from titles.models import Category, Genre, Title
+from titles.models import TOP_TIES, Category, Genre, Title, TitleStats
 from users.models import CustomUser
 
+from api.registry import catalog_registry
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет только поля из get_sparse_fields() представления."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        view = self.context.get('view')
+        fields = getattr(view, 'get_sparse_fields', lambda: None)()
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для категорий."""
@@ -26,19 +41,85 @@ class GenreSerializer(serializers.ModelSerializer):
         slug_field = ('slug',)
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class RegistryCategoryField(serializers.Field):
+    """Категория по category_id из catalog_registry, без JOIN."""
+
+    def __init__(self, **kwargs):
+        kwargs.update(read_only=True, source='category_id')
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return catalog_registry.category(value)
+
+
+class RegistryGenreField(serializers.Field):
+    """
+    Жанры произведения из catalog_registry.
+    Из БД нужны только id жанров (см. TitleViewSet.queryset).
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return [catalog_registry.genre(genre.pk) for genre in value.all()]
+
+
+class RegistrySlugRelatedField(serializers.SlugRelatedField):
+    """Поиск категории или жанра по slug в catalog_registry."""
+
+    def to_internal_value(self, data):
+        try:
+            obj = catalog_registry.get_object(
+                self.get_queryset().model, data)
+        except TypeError:
+            self.fail('invalid')
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        return obj
+
+
+class TitleReadSerializer(SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
     """
     Сериализатор для произведений.
     Операции с чтением.
     """
-    genre = GenreSerializer(many=True)
-    category = CategorySerializer(read_only=True)
+    genre = RegistryGenreField()
+    category = RegistryCategoryField()
     rating = serializers.FloatField(read_only=True)
+    # У каждого отзыва ровно одна оценка: количество оценок
+    # и есть количество отзывов.
+    reviews_count = serializers.IntegerField(
+        source='score_count', read_only=True)
 
     class Meta:
         model = Title
         fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category')
+            'id', 'name', 'year', 'rating', 'reviews_count', 'description',
+            'genre', 'category')
+
+
+class TopTitleSerializer(TitleReadSerializer):
+    """Произведение в рейтинге лучших с местом rank."""
+    rank = serializers.IntegerField(read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = ('rank',) + TitleReadSerializer.Meta.fields
+
+
+class TopTitlesQuerySerializer(serializers.Serializer):
+    """Параметры запроса рейтинга лучших произведений."""
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1)
+    min_reviews = serializers.IntegerField(required=False, min_value=1)
+    ties = serializers.ChoiceField(choices=tuple(TOP_TIES), required=False)
+
+    def validate_limit(self, value):
+        return min(value, settings.TOP_TITLES_MAX_LIMIT)
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
@@ -46,11 +127,11 @@ class TitleWriteSerializer(serializers.ModelSerializer):
     Сериализатор для произведений.
     Операции с записью.
     """
-    genre = serializers.SlugRelatedField(
+    genre = RegistrySlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True)
-    category = serializers.SlugRelatedField(
+    category = RegistrySlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
@@ -64,11 +145,37 @@ class TitleWriteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('score_sum', 'score_count', 'rating')
+
+
+class TitleBatchSerializer(TitleWriteSerializer):
+    """
+    Элемент пакетного создания произведений.
+    Slug жанров и категорий проверяются по catalog_registry.
+    """
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Статистика оценок произведения."""
+    rating = serializers.FloatField(source='mean', read_only=True)
+    median = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True)
 
-class ReviewSerializer(serializers.ModelSerializer):
-    """Сериализатор для отзывов."""
+    class Meta:
+        model = TitleStats
+        fields = ('title', 'count', 'rating', 'median', 'histogram')
+
+
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
+    """
+    Сериализатор для отзывов.
+    Повторный отзыв на произведение отклоняется ограничением
+    unique_title_author при сохранении (см. ReviewViewSet.perform_create).
+    """
     title = serializers.SlugRelatedField(
         slug_field='name',
         read_only=True,
@@ -79,27 +186,13 @@ class ReviewSerializer(serializers.ModelSerializer):
         default=serializers.CurrentUserDefault()
     )
 
-    def validate(self, data):
-        """
-        Проверка на то, что пользователь уже оставлял отзыв на произведение.
-        Предусмотрена возможность оставить только один отзыв.
-        """
-        author = self.context.get('request').user
-        title = get_object_or_404(
-            Title, pk=self.context['view'].kwargs.get('title_id'))
-        if self.context.get('request').method == 'POST':
-            if Review.objects.filter(title=title, author=author).exists():
-                raise serializers.ValidationError('Вы можете оставить только'
-                                                  'один отзыв на произведение!'
-                                                  )
-        return data
-
     class Meta:
         model = Review
         fields = '__all__'
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для комментариев."""
     review = serializers.SlugRelatedField(
         slug_field='text',
@@ -115,6 +208,41 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class CommentCompactSerializer(CommentSerializer):
+    """
+    Компактный сериализатор комментариев.
+    Вместо текста отзыва выводится его id.
+    """
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class TitleBriefSerializer(serializers.ModelSerializer):
+    """Произведение в ленте отзывов автора."""
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name')
+
+
+class ReviewBriefSerializer(serializers.ModelSerializer):
+    """Отзыв в ленте комментариев автора."""
+    title = TitleBriefSerializer(read_only=True)
+
+    class Meta:
+        model = Review
+        fields = ('id', 'text', 'title')
+
+
+class AuthorReviewSerializer(ReviewSerializer):
+    """Отзыв в ленте автора: с id и названием произведения."""
+    title = TitleBriefSerializer(read_only=True)
+
+
+class AuthorCommentSerializer(CommentSerializer):
+    """Комментарий в ленте автора: с отзывом и его произведением."""
+    review = ReviewBriefSerializer(read_only=True)
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Сериализатор модели CustomUser."""
 
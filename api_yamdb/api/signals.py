@@ -0,0 +1,115 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import user_cache, user_resource
+from api.cache import bump_version, bump_version_on_commit
+from api.search import SEARCH_RESOURCE, title_index
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title
+from users.models import CustomUser
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    """Категории выводятся и в списке произведений."""
+    bump_version_on_commit('categories', 'titles')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    bump_version_on_commit('genres', 'titles')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, **kwargs):
+    bump_version_on_commit('titles')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_titles(sender, instance, **kwargs):
+    """Название произведения выводится и в его отзывах."""
+    bump_version_on_commit('titles', f'reviews:{instance.pk}')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    """
+    Отзывы меняют рейтинг в списке произведений,
+    а текст отзыва выводится в его комментариях.
+    """
+    bump_version_on_commit('titles', f'reviews:{instance.title_id}',
+                           f'comments:{instance.pk}')
+
+
+def update_title_index(pk, name):
+    """
+    Обновление индекса поиска после фиксации транзакции: другие процессы
+    перестраивают индекс по новой версии и не должны прочитать
+    незафиксированные названия.
+    """
+    def apply():
+        version, = bump_version(SEARCH_RESOURCE)
+        title_index.update(pk, name, version)
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, **kwargs):
+    update_title_index(instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    update_title_index(instance.pk, None)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, created=True, **kwargs):
+    """
+    Создание и удаление меняют comments_count в списке отзывов.
+    Произведение берётся из загруженного отзыва, иначе запросом.
+    """
+    resources = [f'comments:{instance.review_id}']
+    if created:
+        if Comment.review.is_cached(instance):
+            title_id = instance.review.title_id
+        else:
+            title_id = Review.objects.filter(
+                pk=instance.review_id).values_list(
+                'title_id', flat=True).first()
+        if title_id is not None:
+            resources.append(f'reviews:{title_id}')
+    bump_version_on_commit(*resources)
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user(sender, instance, created, **kwargs):
+    """
+    Роль и активность хранятся в кэше аутентификации, а имя
+    выводится как автор отзывов и комментариев. Общий счётчик users
+    увеличивается только при смене имени: регистрация и выдача токена
+    не сбрасывают ETag отзывов и комментариев.
+    """
+    user_cache.invalidate(instance.pk)
+    resources = [user_resource(instance.pk)]
+    saved_username = getattr(instance, '_saved_username', None)
+    if not created and saved_username != instance.username:
+        resources.append('users')
+    bump_version_on_commit(*resources)
+    instance.remember_username()
+
+
+@receiver(post_delete, sender=CustomUser)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    """
+    Отзывы и комментарии пользователя удаляются каскадом со своими
+    сигналами; здесь сбрасывается только кэш аутентификации.
+    """
+    user_cache.invalidate(instance.pk)
+    bump_version_on_commit(user_resource(instance.pk))
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+from api.cache import file_cache_lock
+
+
+class AuthRateThrottle(SimpleRateThrottle):
+    """
+    Скользящее окно запросов регистрации и получения токена.
+    Время запросов за окно хранится в кэше AUTH_THROTTLE_CACHE_ALIAS,
+    общем для воркеров gunicorn (FileBasedCache). Частоты задаются
+    в AUTH_THROTTLE_RATES по виду ключа; None отключает ограничение.
+    Счётчики раздельные для каждого throttle_scope представления.
+    Чтение и запись истории выполняются под файловой блокировкой,
+    иначе параллельные запросы затирали бы историю друг друга.
+    """
+    kind = None
+    lock_file = 'throttle.lock'
+
+    def __init__(self):
+        self.cache = caches[settings.AUTH_THROTTLE_CACHE_ALIAS]
+
+    def get_ident_value(self, request):
+        """Значение, по которому считаются запросы; None - не ограничивать."""
+        return None
+
+    def allow_request(self, request, view):
+        self.rate = settings.AUTH_THROTTLE_RATES.get(self.kind)
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+        with file_cache_lock(settings.AUTH_THROTTLE_CACHE_ALIAS,
+                             self.lock_file):
+            return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_value(request)
+        if not ident:
+            return None
+        return self.cache_format % {
+            'scope': f'{view.throttle_scope}-{self.kind}',
+            'ident': ident,
+        }
+
+
+class IPRateThrottle(AuthRateThrottle):
+    """По адресу клиента (с учётом NUM_PROXIES)."""
+    kind = 'ip'
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class FieldRateThrottle(AuthRateThrottle):
+    """По значению поля kind из тела запроса, без учёта регистра."""
+
+    def get_ident_value(self, request):
+        data = request.data
+        value = data.get(self.kind) if hasattr(data, 'get') else None
+        if isinstance(value, str):
+            return value.strip().lower()
+        return None
+
+
+class UsernameRateThrottle(FieldRateThrottle):
+    kind = 'username'
+
+
+class EmailRateThrottle(FieldRateThrottle):
+    kind = 'email'
+
+
+AUTH_THROTTLE_CLASSES = (
+    IPRateThrottle, UsernameRateThrottle, EmailRateThrottle)
@@ -1,33 +1,51 @@
 from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django_filters import rest_framework as rest_filters
-from rest_framework import (filters, pagination, viewsets, status,
-                            permissions)
+from rest_framework import (filters, generics, pagination, viewsets,
+                            status, permissions)
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 
-from api import mixins
-from reviews.models import Review
-from titles.models import Category, Genre, Title
-from users.models import CustomUser
-from api.filters import TitleFilter
+from api import cache, mixins
+from api.authentication import get_token_for_user
+from api.cache import bump_version_on_commit
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title, TitleStats
+from users.models import CustomUser, OutgoingEmail
+from api.export import (CONTENT_TYPES, EXPORT_FORMATS, accepts_gzip,
+                        export_catalog)
+from api.filters import AliasOrderingFilter, TitleFilter
+from api.pagination import KeysetPagination, PageNumberOrKeysetPagination
+from api.registry import catalog_registry
+from api.search import SEARCH_RESOURCE
+from api.throttling import AUTH_THROTTLE_CLASSES
 from api.permissions import (IsAdminModeratorAuthorOrReadOnly,
                              IsAdminOrReadOnly, IsAdmin)
-from api.serializers import (CategorySerializer, CommentSerializer,
+from api.serializers import (AuthorCommentSerializer, AuthorReviewSerializer,
+                             CategorySerializer, CommentCompactSerializer,
+                             CommentSerializer,
                              GenreSerializer, ReviewSerializer,
-                             TitleReadSerializer, TitleWriteSerializer,
+                             TitleBatchSerializer, TitleReadSerializer,
+                             TitleStatsSerializer,
+                             TitleWriteSerializer, TopTitleSerializer,
+                             TopTitlesQuerySerializer,
                              NewUserSerializer, TokenGenerationSerializer,
                              UserSerializer)
 
 
-class CategoryViewSet(mixins.CreateListDestroyViewSet):
+class CategoryViewSet(mixins.CachedListMixin, mixins.BatchCreateMixin,
+                      mixins.CreateListDestroyViewSet):
     """Получение списка категорий, создание и удаление категорий."""
+    cache_resources = ('categories',)
+    batch_resources = ('categories', 'titles')
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
@@ -36,9 +54,15 @@ class CategoryViewSet(mixins.CreateListDestroyViewSet):
     search_fields = ('name',)
     permission_classes = (IsAdminOrReadOnly,)
 
+    def validate_batch(self, items, errors):
+        self.validate_unique_slugs(Category, items, errors)
 
-class GenreViewSet(mixins.CreateListDestroyViewSet):
+
+class GenreViewSet(mixins.CachedListMixin, mixins.BatchCreateMixin,
+                   mixins.CreateListDestroyViewSet):
     """Получение списка жанров, создание и удаление жанров."""
+    cache_resources = ('genres',)
+    batch_resources = ('genres', 'titles')
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     lookup_field = 'slug'
@@ -47,45 +71,286 @@ class GenreViewSet(mixins.CreateListDestroyViewSet):
     search_fields = ('name',)
     permission_classes = (IsAdminOrReadOnly,)
 
+    def validate_batch(self, items, errors):
+        self.validate_unique_slugs(Genre, items, errors)
+
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(mixins.ConditionalGetMixin, mixins.CachedListMixin,
+                   mixins.BatchCreateMixin, mixins.SparseFieldsMixin,
+                   mixins.FastListMixin, viewsets.ModelViewSet):
     """Все СRUD-операции с произведениями."""
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score'))
+    cache_resources = ('titles',)
+    etag_resources = ('titles',)
+    sparse_columns = {
+        'id': (),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating',),
+        'reviews_count': ('score_count',),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category_id',),
+    }
+    sparse_prefetch = ('genre',)
+    # Категория и жанры выводятся из catalog_registry,
+    # из БД достаточно category_id и id жанров.
+    queryset = Title.objects.prefetch_related(
+        Prefetch('genre', queryset=Genre.objects.only('id')))
     serializer_class = TitleWriteSerializer
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, AliasOrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('name', 'year', 'rating', 'reviews_count')
+    ordering_aliases = {'reviews_count': 'score_count'}
     pagination_class = pagination.LimitOffsetPagination
     permission_classes = (IsAdminOrReadOnly,)
 
+    def initial(self, request, *args, **kwargs):
+        """
+        Одна проверка версии catalog_registry на запрос:
+        сериализаторы, фильтры и быстрый путь читают его словари.
+        """
+        super().initial(request, *args, **kwargs)
+        catalog_registry.ensure_current()
+
+    def get_queryset(self):
+        return self.sparse_queryset(super().get_queryset())
+
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False, url_path='export', permission_classes=(IsAdmin,))
+    def export(self, request):
+        """
+        Потоковая выгрузка всего каталога с отзывами и комментариями.
+        ?export_format=ndjson|csv; если Accept-Encoding допускает gzip
+        (с учётом q-значений), поток сжимается.
+        """
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'export_format': [
+                f'Допустимые значения: {", ".join(EXPORT_FORMATS)}.']})
+        compress = accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        response = StreamingHttpResponse(
+            export_catalog(export_format, compress=compress),
+            content_type=CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = (
+            f'attachment; filename="catalog.{export_format}"')
+        response['Vary'] = 'Accept-Encoding'
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        return response
+
+    @action(detail=True, url_path='stats')
+    def stats(self, request, pk=None):
+        """
+        Гистограмма оценок, медиана и количество отзывов произведения.
+        Произведение читается вместе со строкой TitleStats одним запросом.
+        Строка создаётся вместе с произведением; если её нет, отдаётся
+        пустая статистика без записи в БД.
+        """
+        title = generics.get_object_or_404(
+            Title.objects.select_related('stats'), pk=pk)
+        try:
+            stats = title.stats
+        except TitleStats.DoesNotExist:
+            stats = TitleStats(title=title)
+        return Response(TitleStatsSerializer(stats).data)
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        """
+        Лучшие произведения: ?category=, ?genre=, ?limit=,
+        ?min_reviews= и ?ties= (порядок при равном рейтинге).
+        Равный рейтинг - одно место. Ответ кэшируется до изменения
+        произведений или отзывов.
+        """
+        params = TopTitlesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        key = cache.response_cache_key(('titles',), request)
+        data = cache.get_response_data(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        titles = self.get_top_titles(**params.validated_data)
+        rank = 0
+        for position, title in enumerate(titles, start=1):
+            if position == 1 or title.rating != titles[position - 2].rating:
+                rank = position
+            title.rank = rank
+        data = TopTitleSerializer(titles, many=True).data
+        cache.set_response_data(key, data)
+        return Response(data, headers={'X-Cache': 'MISS'})
+
+    def get_top_titles(self, category=None, genre=None, limit=None,
+                       min_reviews=None, ties=None):
+        queryset = Title.objects.top(
+            min_reviews or settings.TOP_TITLES_MIN_REVIEWS,
+            ties or settings.TOP_TITLES_TIES)
+        for slug, lookup, get_id in (
+                (category, 'category_id', catalog_registry.category_id),
+                (genre, 'genre', catalog_registry.genre_id)):
+            if slug is None:
+                continue
+            pk = get_id(slug)
+            if pk is None:
+                return []
+            queryset = queryset.filter(**{lookup: pk})
+        queryset = queryset.prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.only('id')))
+        return list(queryset[:limit or settings.TOP_TITLES_LIMIT])
+
+    def get_batch_serializer_class(self):
+        return TitleBatchSerializer
+
+    def validate_batch(self, items, errors):
+        """Slug жанров и категорий пакета проверяются по catalog_registry."""
+        self.genre_ids = catalog_registry.genre_ids
+        self.category_ids = catalog_registry.category_ids
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+            for field, slugs, known in (
+                    ('genre', item['genre'], self.genre_ids),
+                    ('category', (item['category'],), self.category_ids)):
+                for slug in slugs:
+                    if slug not in known:
+                        errors[index].setdefault(field, []).append(
+                            f'Объект с slug={slug} не существует.')
+
+    def perform_batch_create(self, items):
+        """
+        Вставка произведений и связей с жанрами через bulk_create.
+        Если СУБД не возвращает id при пакетной вставке,
+        произведения сохраняются по одному.
+        """
+        titles = [
+            Title(name=item['name'],
+                  year=item['year'],
+                  description=item.get('description'),
+                  category_id=self.category_ids[item['category']])
+            for item in items
+        ]
+        if connection.features.can_return_ids_from_bulk_insert:
+            Title.objects.bulk_create(titles)
+        else:
+            for title in titles:
+                title.save()
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk,
+                                genre_id=self.genre_ids[slug])
+            for title, item in zip(titles, items)
+            for slug in dict.fromkeys(item['genre'])
+        )
+        TitleStats.objects.create_empty(title.pk for title in titles)
+        bump_version_on_commit('titles', SEARCH_RESOURCE)
+        return [
+            {
+                'id': title.pk,
+                'genre': list(dict.fromkeys(item['genre'])),
+                'category': item['category'],
+                'name': title.name,
+                'year': title.year,
+                'description': title.description,
+            }
+            for title, item in zip(titles, items)
+        ]
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(mixins.ConditionalGetMixin, mixins.SparseFieldsMixin,
+                    mixins.FastListMixin, viewsets.ModelViewSet):
     """Все СRUD-операции с отзывами."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
+    pagination_class = PageNumberOrKeysetPagination
+    filter_backends = (filters.OrderingFilter,)
+    ordering_fields = ('pub_date', 'score', 'comments_count')
+    sparse_columns = {
+        'id': (),
+        'title': ('title__name',),
+        'author': ('author__username',),
+        'text': ('text',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+        'comments_count': ('comments_count',),
+    }
+    # title нужен менеджеру title.reviews, pub_date - пагинации.
+    sparse_required = ('title', 'pub_date')
+
+    def get_etag_resources(self):
+        return (f'reviews:{self.kwargs.get("title_id")}', 'users')
+
+    def get_title(self):
+        """Произведение из URL; запрашивается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id'))
+        return self._title
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.sparse_queryset(
+            self.get_title().reviews.select_related('author', 'title'))
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        serializer.save(author=self.request.user, title=title)
+        """
+        Дубликат отзыва определяется ограничением unique_title_author,
+        без отдельной проверки exists() и гонки между ней и вставкой.
+        Остальные ошибки целостности не маскируются: после ошибки
+        наличие отзыва автора перепроверяется.
+        """
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            if not title.reviews.filter(author=self.request.user).exists():
+                raise
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Вы можете оставить только '
+                'один отзыв на произведение!'
+            ]})
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(mixins.ConditionalGetMixin, mixins.SparseFieldsMixin,
+                     mixins.FastListMixin, viewsets.ModelViewSet):
     """Все СRUD-операции с комментариями."""
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
+    pagination_class = PageNumberOrKeysetPagination
+    sparse_columns = {
+        'id': (),
+        'review': ('review__text',),
+        'author': ('author__username',),
+        'text': ('text',),
+        'pub_date': ('pub_date',),
+    }
+    # review нужен менеджеру review.comments, pub_date - пагинации.
+    sparse_required = ('review', 'pub_date')
+
+    def get_etag_resources(self):
+        return (f'comments:{self.kwargs.get("review_id")}', 'users')
+
+    def is_compact(self):
+        """Компактный режим: ?compact=true."""
+        return self.request.query_params.get('compact') in ('1', 'true')
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return CommentCompactSerializer
+        return CommentSerializer
+
+    def get_sparse_columns(self):
+        if self.is_compact():
+            return {**self.sparse_columns, 'review': ('review',)}
+        return self.sparse_columns
 
     def get_queryset(self):
         review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        return review.comments.all()
+        if self.is_compact():
+            return self.sparse_queryset(
+                review.comments.select_related('author'))
+        return self.sparse_queryset(
+            review.comments.select_related('author', 'review'))
 
     def perform_create(self, serializer):
         review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
@@ -98,32 +363,36 @@ token_generator = PasswordResetTokenGenerator()
 class NewUserView(APIView):
     """Регистрация пользователей."""
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'signup'
 
     def post(self, request):
         """
         Получение от пользователя имени и электронной почты.
-        Генерация кода подтверждения и отправка его на почтовый адрес.
+        Генерация кода подтверждения и постановка письма с ним в очередь
+        (отправляет команда send_outbox).
         Сохранение неактивной учетной записи в БД.
         """
         serializer = NewUserSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data.get('username')
         email = serializer.validated_data.get('email')
-        user, created = CustomUser.objects.get_or_create(
-            username=username,
-            email=email
-        )
-        confirmation_code = token_generator.make_token(user)
-        message = f'Ваш код подтверждения: {confirmation_code}'
-        if created:
-            user.is_active = False
-            user.save()
-        send_mail(
-            subject='Код подтверждения',
-            message=message,
-            from_email=settings.EMAIL_FROM,
-            recipient_list=(email,)
-        )
+        with transaction.atomic():
+            user, created = CustomUser.objects.get_or_create(
+                username=username,
+                email=email
+            )
+            confirmation_code = token_generator.make_token(user)
+            message = f'Ваш код подтверждения: {confirmation_code}'
+            if created:
+                user.is_active = False
+                user.save()
+            OutgoingEmail.objects.create(
+                subject='Код подтверждения',
+                body=message,
+                from_email=settings.EMAIL_FROM,
+                recipient=email
+            )
         context = {
             'username': username,
             'email': email
@@ -134,6 +403,8 @@ class NewUserView(APIView):
 class GetTokenView(APIView):
     """Получение токена."""
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    throttle_scope = 'token'
 
     def post(self, request):
         serializer = TokenGenerationSerializer(data=request.data)
@@ -144,7 +415,7 @@ class GetTokenView(APIView):
         if token_generator.check_token(user, confirmation_code):
             user.is_active = True
             user.save()
-            token = AccessToken.for_user(user)
+            token = get_token_for_user(user)
             return Response({'token': f'{token}'}, status=status.HTTP_200_OK)
         return Response(
             {'confirmation_code': 'Код не действителен.'},
@@ -177,3 +448,31 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             serializer.save(role=user.role)
         return Response(serializer.data)
+
+    def author_feed(self, queryset, serializer_class):
+        """
+        Записи автора из URL с keyset-пагинацией по (pub_date, id).
+        Выборка идёт по индексу (author, pub_date, id).
+        """
+        author = get_object_or_404(
+            CustomUser.objects.only('pk'), username=self.kwargs['username'])
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(
+            queryset.filter(author=author.pk), self.request, self)
+        serializer = serializer_class(
+            page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, permission_classes=(permissions.AllowAny,))
+    def reviews(self, request, username=None):
+        """Отзывы пользователя с произведениями."""
+        return self.author_feed(
+            Review.objects.select_related('title', 'author'),
+            AuthorReviewSerializer)
+
+    @action(detail=True, permission_classes=(permissions.AllowAny,))
+    def comments(self, request, username=None):
+        """Комментарии пользователя с отзывами и их произведениями."""
+        return self.author_feed(
+            Comment.objects.select_related('review__title', 'author'),
+            AuthorCommentSerializer)
@@ -0,0 +1,84 @@
+"""
+Конфигурация gunicorn для продакшена:
+gunicorn api_yamdb.wsgi:application -c python:api_yamdb.gunicorn_conf
+
+Приложение загружается и прогревается в мастер-процессе до fork
+(preload), воркеры открывают соединения с БД сразу после запуска
+и сообщают время обработки первого запроса.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import wait
+
+bind = os.getenv('GUNICORN_BIND', '0:8000')
+workers = int(os.getenv(
+    'GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = os.getenv(
+    'GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = max_requests // 10
+accesslog = '-'
+
+
+def when_ready(server):
+    """Прогрев в мастере до запуска воркеров (только с preload)."""
+    if server.cfg.preload_app:
+        from api_yamdb.warmup import warmup
+        server.log.info('Прогрев приложения за %.3f с', warmup())
+
+
+def post_fork(server, worker):
+    worker.started = time.monotonic()
+    worker.first_request = True
+
+
+def post_worker_init(worker):
+    """
+    Соединения с БД до первого запроса.
+    У gthread соединения свои в каждом потоке пула: каждый поток
+    открывает своё (барьер не даёт одному потоку взять две задачи),
+    дальше их сохраняет CONN_MAX_AGE.
+    """
+    from api_yamdb.warmup import connect
+
+    pool = getattr(worker, 'tpool', None)
+    if pool is None:
+        connect()
+    else:
+        barrier = threading.Barrier(worker.cfg.threads)
+
+        def connect_thread():
+            barrier.wait(timeout=worker.cfg.timeout)
+            return connect()
+
+        done, _ = wait(
+            [pool.submit(connect_thread)
+             for _ in range(worker.cfg.threads)],
+            timeout=worker.cfg.timeout)
+        failed = [future for future in done if future.exception()]
+        if failed or len(done) < worker.cfg.threads:
+            worker.log.warning(
+                'Соединения с БД открыты не во всех потоках воркера')
+    worker.log.info('Воркер готов за %.3f с',
+                    time.monotonic() - worker.started)
+
+
+def pre_request(worker, req):
+    if worker.first_request:
+        req.started = time.monotonic()
+
+
+def post_request(worker, req, environ, resp):
+    """Время обработки первого запроса воркера - эффект прогрева."""
+    if worker.first_request:
+        worker.first_request = False
+        now = time.monotonic()
+        worker.log.info(
+            'Первый запрос обработан за %.3f с (%.3f с после запуска воркера)',
+            now - req.started, now - worker.started)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 from dotenv import load_dotenv
 
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'django_filters',
@@ -30,9 +32,11 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'reviews.apps.ReviewsConfig',
     'titles.apps.TitlesConfig',
+    'benchmarks.apps.BenchmarksConfig',
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,7 +75,10 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default="postgres"),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default="postgres"),
         'HOST': os.getenv('DB_HOST', default="db"),
-        'PORT': os.getenv('DB_PORT', default="5432")
+        'PORT': os.getenv('DB_PORT', default="5432"),
+        # Постоянные соединения: потоки воркеров gthread подключаются
+        # к БД один раз, а не на каждый запрос.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
     }
 }
 
@@ -109,6 +116,60 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Кэш в файлах общий для воркеров gunicorn и команд manage.py:
+# версии ресурсов, которые увеличивают import_csv, recalculate_ratings
+# и другие команды, должны доходить до воркеров.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            default=os.path.join(tempfile.gettempdir(), 'yamdb-cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=5000)),
+        },
+    },
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'THROTTLE_CACHE_LOCATION',
+            default=os.path.join(tempfile.gettempdir(), 'yamdb-throttle')),
+    },
+}
+
+# Кэш ответов списков категорий, жанров и произведений.
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 60 * 5
+
+# Вывод списков произведений, отзывов и комментариев из values()
+# без создания моделей и работы сериализаторов (api.fastpath).
+API_FAST_LIST = False
+
+# Рейтинг лучших произведений /api/v1/titles/top/: размер по умолчанию
+# и максимальный, минимум отзывов и порядок при равном рейтинге
+# (titles.models.TOP_TIES); минимум и порядок можно задать в запросе.
+TOP_TITLES_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
+TOP_TITLES_MIN_REVIEWS = 1
+TOP_TITLES_TIES = 'reviews'
+
+# Ограничение частоты регистрации и получения токена (api.throttling):
+# скользящее окно по адресу клиента, имени пользователя и почте.
+# Кэш в файлах общий для всех воркеров gunicorn; None отключает ключ.
+AUTH_THROTTLE_CACHE_ALIAS = 'throttle'
+AUTH_THROTTLE_RATES = {
+    'ip': '20/min',
+    'username': '5/min',
+    'email': '5/min',
+}
+
+# Поиск произведений по названию: путь к классу бэкенда
+# или None для выбора по типу СУБД (см. api.search).
+TITLE_SEARCH_BACKEND = None
+TITLE_SEARCH_CONFIG = 'russian'
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.PageNumberPagination',
@@ -116,11 +177,14 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ]
+    ],
+    # Число прокси перед приложением (nginx) для адреса клиента
+    # из X-Forwarded-For; 0 - адрес соединения.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=0)),
 }
 
 SIMPLE_JWT = {
@@ -128,6 +192,17 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Метрики Prometheus (api.metrics): каждый процесс сохраняет свой снимок
+# в METRICS_DIR не чаще раза в METRICS_FLUSH_INTERVAL секунд.
+METRICS_DIR = os.getenv(
+    'METRICS_DIR',
+    default=os.path.join(tempfile.gettempdir(), 'yamdb-metrics'))
+METRICS_FLUSH_INTERVAL = 1.0
+
+# Кэш пользователей для аутентификации по JWT (api.authentication).
+USER_CACHE_MAX_SIZE = 1024
+USER_CACHE_TTL = 60
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 EMAIL_FROM = 'team20@gmail.com'
@@ -0,0 +1,79 @@
+import logging
+import time
+
+from django.db import DatabaseError, connection, connections
+from django.urls import URLResolver, get_resolver
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from api import serializers as api_serializers
+from api.registry import catalog_registry
+
+logger = logging.getLogger(__name__)
+
+
+def iter_patterns(resolver):
+    for pattern in resolver.url_patterns:
+        yield pattern
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern)
+
+
+def warm_urls():
+    """Компиляция регулярных выражений всех маршрутов и таблиц reverse."""
+    resolver = get_resolver()
+    resolver.reverse_dict
+    for pattern in iter_patterns(resolver):
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            pattern.reverse_dict
+
+
+def warm_serializers():
+    """
+    Настройки DRF и поля всех сериализаторов API.
+    Поля ModelSerializer строятся по метаданным моделей при первом
+    обращении, что иначе происходит на первых запросах воркера.
+    """
+    for setting in ('DEFAULT_RENDERER_CLASSES', 'DEFAULT_PARSER_CLASSES',
+                    'DEFAULT_AUTHENTICATION_CLASSES',
+                    'DEFAULT_PERMISSION_CLASSES',
+                    'DEFAULT_CONTENT_NEGOTIATION_CLASS'):
+        getattr(api_settings, setting)
+    for value in vars(api_serializers).values():
+        if (isinstance(value, type)
+                and issubclass(value, serializers.Serializer)
+                and value.__module__ == api_serializers.__name__):
+            value().fields
+
+
+def warmup():
+    """
+    Подготовка приложения в мастер-процессе gunicorn до fork.
+    Справочник категорий и жанров воркеры получают уже загруженным.
+    Соединения с БД закрываются: каждый воркер открывает свои.
+    """
+    started = time.monotonic()
+    warm_urls()
+    warm_serializers()
+    try:
+        catalog_registry.ensure_current()
+    except DatabaseError:
+        logger.warning('БД недоступна, справочник загрузится в воркерах')
+    connections.close_all()
+    elapsed = time.monotonic() - started
+    logger.info('Прогрев завершён за %.3f с', elapsed)
+    return elapsed
+
+
+def connect():
+    """
+    Соединение с БД в текущем потоке воркера до первого запроса.
+    Недоступная БД не мешает запуску: соединение откроется по запросу.
+    """
+    try:
+        connection.ensure_connection()
+    except DatabaseError:
+        logger.warning('БД недоступна, соединение откроется при запросе')
+        return False
+    return True
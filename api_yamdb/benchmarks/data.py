@@ -0,0 +1,105 @@
+import random
+from collections import namedtuple
+
+from django.contrib.auth.hashers import make_password
+
+from api.cache import bump_version
+from api.search import SEARCH_RESOURCE
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title, TitleStats
+from users.models import CustomUser
+
+Scale = namedtuple('Scale', (
+    'titles', 'users', 'reviews_per_title', 'comments_per_review',
+    'genres_per_title',
+))
+
+SCALES = {
+    'small': Scale(200, 100, 5, 2, 2),
+    'medium': Scale(2000, 500, 10, 3, 3),
+    'large': Scale(20000, 2000, 20, 3, 3),
+}
+CATEGORIES = 10
+GENRES = 20
+WORDS = ('тихий', 'дом', 'река', 'ночь', 'город', 'звезда', 'последний',
+         'путь', 'зима', 'сад', 'море', 'время', 'огонь', 'небо')
+
+
+def create(model, objects, **lookup):
+    """
+    bulk_create и id созданных записей по возрастанию.
+    id читаются запросом, так как SQLite не возвращает их из bulk_create.
+    """
+    model.objects.bulk_create(objects)
+    return list(model.objects.filter(**lookup).order_by('pk').values_list(
+        'pk', flat=True))
+
+
+def generate(scale, seed):
+    """
+    Детерминированный каталог заданного масштаба.
+    Все записи помечены префиксом bench<seed>, чтобы не пересекаться
+    с уже загруженными данными. Возвращает данные для сценариев.
+    """
+    if scale.reviews_per_title > scale.users:
+        raise ValueError(
+            'Отзывов на произведение не может быть больше пользователей.')
+    if scale.genres_per_title > GENRES:
+        raise ValueError(f'Жанров на произведение не больше {GENRES}.')
+    rng = random.Random(seed)
+    prefix = f'bench{seed}'
+    category_ids = create(Category, (
+        Category(name=f'Категория {i}', slug=f'{prefix}-category-{i}')
+        for i in range(CATEGORIES)
+    ), slug__startswith=f'{prefix}-category-')
+    genre_ids = create(Genre, (
+        Genre(name=f'Жанр {i}', slug=f'{prefix}-genre-{i}')
+        for i in range(GENRES)
+    ), slug__startswith=f'{prefix}-genre-')
+    password = make_password(None)
+    user_ids = create(CustomUser, (
+        CustomUser(username=f'{prefix}_user{i}',
+                   email=f'{prefix}_user{i}@bench.fake',
+                   password=password)
+        for i in range(scale.users)
+    ), username__startswith=f'{prefix}_user')
+    title_ids = create(Title, (
+        Title(name=f'{prefix} {" ".join(rng.sample(WORDS, 3))} {i}',
+              year=rng.randint(1950, 2020),
+              description=' '.join(rng.choice(WORDS) for _ in range(50)),
+              category_id=rng.choice(category_ids))
+        for i in range(scale.titles)
+    ), name__startswith=f'{prefix} ')
+    Title.genre.through.objects.bulk_create((
+        Title.genre.through(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rng.sample(genre_ids, scale.genres_per_title)
+    ))
+    review_ids = create(Review, (
+        Review(title_id=title_id, author_id=author_id,
+               text=f'{prefix} ' + ' '.join(
+                   rng.choice(WORDS) for _ in range(30)),
+               score=rng.randint(1, 10))
+        for title_id in title_ids
+        for author_id in rng.sample(user_ids, scale.reviews_per_title)
+    ), text__startswith=f'{prefix} ')
+    Comment.objects.bulk_create((
+        Comment(review_id=review_id, author_id=rng.choice(user_ids),
+                text=' '.join(rng.choice(WORDS) for _ in range(15)))
+        for review_id in review_ids
+        for _ in range(scale.comments_per_review)
+    ))
+    # bulk_create не отправляет сигналы моделей.
+    Title.objects.filter(name__startswith=f'{prefix} ').recalculate_scores()
+    Review.objects.filter(
+        text__startswith=f'{prefix} ').recalculate_comments()
+    TitleStats.objects.rebuild()
+    bump_version('categories', 'genres', 'titles', SEARCH_RESOURCE)
+    return {
+        'prefix': prefix,
+        'title_ids': title_ids,
+        'review_ids': review_ids,
+        'user_ids': user_ids,
+        'genre_slug': f'{prefix}-genre-0',
+        'category_slug': f'{prefix}-category-0',
+    }
@@ -0,0 +1,120 @@
+import time
+
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import connection
+from rest_framework.test import APIClient
+
+from api.authentication import get_token_for_user
+from users.models import CustomUser
+
+
+def percentile(values, fraction):
+    """Перцентиль с линейной интерполяцией между соседними значениями."""
+    values = sorted(values)
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (
+        position - lower)
+
+
+class QueryCounter:
+    """Обёртка для connection.execute_wrapper."""
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+def authenticated_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_token_for_user(user)}')
+    return client
+
+
+def build_scenarios(data, calls):
+    """
+    Сценарии: имя -> функция(номер вызова) -> ответ.
+    Пользователи для сценариев с записью (на calls вызовов)
+    создаются заранее, чтобы не влиять на замеры.
+    """
+    prefix = data['prefix']
+    title_ids = data['title_ids']
+    title_id = title_ids[0]
+    review_id = data['review_ids'][0]
+    anonymous = APIClient()
+    user = CustomUser.objects.get(pk=data['user_ids'][0])
+    reader = authenticated_client(user)
+    token_code = PasswordResetTokenGenerator().make_token(user)
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f'{prefix}_reviewer{i}',
+                   email=f'{prefix}_reviewer{i}@bench.fake')
+        for i in range(calls)
+    )
+    reviewers = list(CustomUser.objects.filter(
+        username__startswith=f'{prefix}_reviewer').order_by('pk'))
+    reviewer_clients = [
+        authenticated_client(reviewer) for reviewer in reviewers]
+    return {
+        'titles-list': lambda i: anonymous.get('/api/v1/titles/'),
+        'titles-list-auth': lambda i: reader.get('/api/v1/titles/'),
+        'titles-detail': lambda i: anonymous.get(
+            f'/api/v1/titles/{title_ids[i % len(title_ids)]}/'),
+        'titles-filter': lambda i: reader.get(
+            '/api/v1/titles/', {'genre': data['genre_slug'],
+                                'category': data['category_slug']}),
+        'titles-search': lambda i: reader.get(
+            '/api/v1/titles/', {'name': 'тихий дом'}),
+        'reviews-list': lambda i: anonymous.get(
+            f'/api/v1/titles/{title_id}/reviews/'),
+        'comments-list': lambda i: anonymous.get(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'),
+        'signup': lambda i: anonymous.post(
+            '/api/v1/auth/signup/',
+            {'username': f'{prefix}_signup{i}',
+             'email': f'{prefix}_signup{i}@bench.fake'},
+            REMOTE_ADDR=f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}'),
+        'token': lambda i: anonymous.post(
+            '/api/v1/auth/token/',
+            {'username': user.username, 'confirmation_code': token_code}),
+        'review-create': lambda i: reviewer_clients[i].post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            {'text': 'Отзыв из бенчмарка', 'score': 1 + i % 10}),
+    }
+
+
+def run_scenario(request, iterations, warmup):
+    """
+    Замер одного сценария.
+    Первые warmup вызовов не учитываются; номера итераций сквозные,
+    поэтому сценарии с записью не повторяют данные прогрева.
+    """
+    for i in range(warmup):
+        request(i)
+    latencies = []
+    queries = 0
+    started = time.perf_counter()
+    for i in range(warmup, warmup + iterations):
+        counter = QueryCounter()
+        request_started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = request(i)
+        latencies.append(time.perf_counter() - request_started)
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f'Ответ {response.status_code}: {response.content[:200]!r}')
+        queries += counter.queries
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': iterations,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': sum(latencies) / iterations * 1000,
+        'throughput_rps': iterations / elapsed,
+        'queries_per_request': queries / iterations,
+    }
@@ -0,0 +1,108 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+from benchmarks.data import SCALES, generate
+from benchmarks.harness import build_scenarios, run_scenario
+from benchmarks.report import (build_results, compare, read_results,
+                               write_results)
+
+SCENARIOS = (
+    'titles-list', 'titles-list-auth', 'titles-detail', 'titles-filter',
+    'titles-search', 'reviews-list', 'comments-list', 'signup', 'token',
+    'review-create',
+)
+
+
+class Rollback(Exception):
+    """Откат сгенерированных данных после замеров."""
+
+
+class Command(BaseCommand):
+    """Нагрузочный бенчмарк API на синтетических данных."""
+    help = ('Генерирует каталог заданного масштаба, замеряет задержку '
+            'и количество запросов к БД по сценариям API и сравнивает '
+            'результат с базовым.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=SCALES, default='small',
+            help='Масштаб синтетических данных.')
+        for field in SCALES['small']._fields:
+            parser.add_argument(
+                f'--{field.replace("_", "-")}', type=int,
+                help=f'Переопределить {field} выбранного масштаба.')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help='Замеряемых запросов на сценарий.')
+        parser.add_argument(
+            '--warmup', type=int, default=5,
+            help='Незамеряемых запросов перед замером.')
+        parser.add_argument(
+            '--scenario', nargs='+', choices=SCENARIOS,
+            help='Запустить только перечисленные сценарии.')
+        parser.add_argument(
+            '--output', help='JSON с результатами; '
+                             'по умолчанию benchmark-<масштаб>.json.')
+        parser.add_argument(
+            '--baseline', help='JSON с базовыми результатами для сравнения.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост задержки относительно базового (доля).')
+        parser.add_argument(
+            '--keep-data', action='store_true',
+            help='Сохранить сгенерированные данные в БД.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] <= 0 or options['warmup'] < 0:
+            raise CommandError('Некорректное число итераций.')
+        scale = SCALES[options['scale']]._replace(**{
+            field: options[field] for field in SCALES['small']._fields
+            if options[field] is not None
+        })
+        baseline = options['baseline'] and read_results(options['baseline'])
+        try:
+            # Сценарии повторяют запросы одного клиента: с ограничением
+            # частоты регистрации и токена замерялись бы ответы 429.
+            with transaction.atomic(), override_settings(
+                    AUTH_THROTTLE_RATES={}):
+                scenarios = self.run(scale, options)
+                if not options['keep_data']:
+                    raise Rollback
+        except Rollback:
+            pass
+        except ValueError as error:
+            raise CommandError(error)
+        results = build_results(
+            scenarios, scale=scale._asdict(), seed=options['seed'],
+            iterations=options['iterations'], warmup=options['warmup'])
+        output = options['output'] or f'benchmark-{options["scale"]}.json'
+        write_results(results, output)
+        self.stdout.write(f'Результаты сохранены в {output}')
+        if baseline:
+            regressions = compare(results, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError(
+                    'Регрессии относительно базового результата:\n'
+                    + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def run(self, scale, options):
+        self.stdout.write(f'Генерация данных: {dict(scale._asdict())}')
+        data = generate(scale, options['seed'])
+        requests = build_scenarios(
+            data, options['warmup'] + options['iterations'])
+        self.stdout.write(
+            f'{"сценарий":<18}{"p50":>9}{"p95":>9}{"p99":>9}'
+            f'{"rps":>9}{"sql":>7}')
+        scenarios = {}
+        for name in options['scenario'] or SCENARIOS:
+            result = run_scenario(
+                requests[name], options['iterations'], options['warmup'])
+            scenarios[name] = result
+            self.stdout.write(
+                f'{name:<18}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+                f'{result["p99_ms"]:>9.2f}{result["throughput_rps"]:>9.1f}'
+                f'{result["queries_per_request"]:>7.1f}')
+        return scenarios
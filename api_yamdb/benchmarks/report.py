@@ -0,0 +1,56 @@
+import json
+import platform
+import time
+
+import django
+from django.db import connection
+
+# Показатели, рост которых считается регрессией.
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+def build_results(scenarios, **meta):
+    return {
+        'meta': {
+            'timestamp': int(time.time()),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            **meta,
+        },
+        'scenarios': scenarios,
+    }
+
+
+def write_results(results, path):
+    with open(path, 'w', encoding='utf-8') as results_file:
+        json.dump(results, results_file, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+
+
+def read_results(path):
+    with open(path, encoding='utf-8') as results_file:
+        return json.load(results_file)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Регрессии относительно baseline: рост задержки больше чем
+    на tolerance (доля) и любой рост числа запросов на запрос.
+    """
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            continue
+        for metric in LATENCY_METRICS:
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: {metric} {previous[metric]:.2f} -> '
+                    f'{current[metric]:.2f}')
+        if current['queries_per_request'] > previous['queries_per_request']:
+            regressions.append(
+                f'{name}: queries_per_request '
+                f'{previous["queries_per_request"]:.2f} -> '
+                f'{current["queries_per_request"]:.2f}')
+    return regressions
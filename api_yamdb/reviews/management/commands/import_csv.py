@@ -0,0 +1,363 @@
+import csv
+import io
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from api.authentication import user_resource
+from api.cache import bump_version
+from api.search import SEARCH_RESOURCE
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title, TitleStats
+from users.models import CustomUser
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def parse_pub_date(value):
+    pub_date = parse_datetime(value)
+    if pub_date is None:
+        raise ValueError(f'Некорректная дата: {value!r}')
+    return pub_date
+
+
+def build_user(row, maps):
+    return CustomUser(
+        id=int(row['id']),
+        username=row['username'],
+        email=row['email'],
+        role=row['role'] or CustomUser.USER,
+        bio=row['bio'] or None,
+        first_name=row['first_name'],
+        last_name=row['last_name'],
+        password=make_password(None),
+    )
+
+
+def build_category(row, maps):
+    return Category(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+
+def build_genre(row, maps):
+    return Genre(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+
+def build_title(row, maps):
+    category_id = None
+    if row['category']:
+        category_id = maps.resolve(Category, row['category'])
+    return Title(
+        id=int(row['id']),
+        name=row['name'],
+        year=int(row['year']),
+        description=row.get('description') or None,
+        category_id=category_id,
+    )
+
+
+def build_genre_title(row, maps):
+    return Title.genre.through(
+        id=int(row['id']),
+        title_id=maps.resolve(Title, row['title_id']),
+        genre_id=maps.resolve(Genre, row['genre_id']),
+    )
+
+
+def build_review(row, maps):
+    return Review(
+        id=int(row['id']),
+        title_id=maps.resolve(Title, row['title_id']),
+        author_id=maps.resolve(CustomUser, row['author']),
+        text=row['text'],
+        score=int(row['score']),
+        pub_date=parse_pub_date(row['pub_date']),
+    )
+
+
+def build_comment(row, maps):
+    return Comment(
+        id=int(row['id']),
+        review_id=maps.resolve(Review, row['review_id']),
+        author_id=maps.resolve(CustomUser, row['author']),
+        text=row['text'],
+        pub_date=parse_pub_date(row['pub_date']),
+    )
+
+
+# Наборы данных в порядке зависимостей по внешним ключам.
+DATASETS = (
+    ('users', 'users.csv', CustomUser, build_user),
+    ('category', 'category.csv', Category, build_category),
+    ('genre', 'genre.csv', Genre, build_genre),
+    ('titles', 'titles.csv', Title, build_title),
+    ('genre_title', 'genre_title.csv', Title.genre.through,
+     build_genre_title),
+    ('review', 'review.csv', Review, build_review),
+    ('comments', 'comments.csv', Comment, build_comment),
+)
+# Производные таблицы: очищаются вместе с исходными и пересчитываются
+# после загрузки.
+DERIVED = {Title: (TitleStats,)}
+
+
+class MissingReference(Exception):
+    """Строка ссылается на запись, которой нет ни в БД, ни в файлах."""
+
+
+class IdMaps:
+    """
+    Соответствие id из CSV идентификаторам в БД для каждой модели.
+    Загружается один раз из БД и пополняется по мере импорта,
+    поэтому внешние ключи разрешаются без запросов.
+    """
+
+    def __init__(self):
+        self.maps = {}
+
+    def get(self, model):
+        if model not in self.maps:
+            self.maps[model] = {
+                str(pk): pk
+                for pk in model.objects.values_list('pk', flat=True)
+                .iterator()
+            }
+        return self.maps[model]
+
+    def resolve(self, model, csv_id):
+        try:
+            return self.get(model)[csv_id]
+        except KeyError:
+            raise MissingReference(
+                f'{model._meta.object_name} с id={csv_id} не найден')
+
+    def add(self, model, pk):
+        self.get(model)[str(pk)] = pk
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+@contextmanager
+def explicit_auto_now_add(model):
+    """
+    Отключение auto_now_add на время bulk_create,
+    чтобы сохранить даты публикации из файла.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def copy_objects(model, objects):
+    """Вставка пачки объектов через COPY ... FROM STDIN (PostgreSQL)."""
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for obj in objects:
+        row = []
+        for field in fields:
+            value = field.get_db_prep_save(
+                getattr(obj, field.attname), connection)
+            row.append(r'\N' if value is None else value)
+        writer.writerow(row)
+    buffer.seek(0)
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+            f'({columns}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')',
+            buffer
+        )
+
+
+class Command(BaseCommand):
+    """Потоковая загрузка тестовых данных из static/data/*.csv."""
+    help = ('Загружает CSV-файлы из static/data в порядке зависимостей '
+            'пачками через bulk_create или COPY (PostgreSQL).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DATA_DIR,
+            help='Каталог с CSV-файлами.')
+        parser.add_argument(
+            '--only', nargs='+', choices=[name for name, *_ in DATASETS],
+            help='Загрузить только перечисленные наборы данных.')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одной вставке.')
+        parser.add_argument(
+            '--truncate', action='store_true',
+            help='Очистить таблицы выбранных наборов перед загрузкой.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Прочитать файлы и проверить ссылки без записи в БД.')
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Использовать bulk_create даже на PostgreSQL.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size должен быть положительным.')
+        datasets = [
+            dataset for dataset in DATASETS
+            if not options['only'] or dataset[0] in options['only']
+        ]
+        self.dry_run = options['dry_run']
+        self.batch_size = options['batch_size']
+        self.use_copy = (connection.vendor == 'postgresql'
+                         and not options['no_copy'])
+        if options['truncate'] and not self.dry_run:
+            self.truncate([model for _, _, model, _ in datasets])
+        maps = IdMaps()
+        started = time.monotonic()
+        total = 0
+        for name, filename, model, build in datasets:
+            total += self.load(
+                name, os.path.join(options['path'], filename),
+                model, build, maps)
+        if not self.dry_run:
+            self.reset_sequences([model for _, _, model, _ in datasets])
+            if any(model is Review for _, _, model, _ in datasets):
+                fixed = Title.objects.recalculate_scores()
+                TitleStats.objects.rebuild()
+                self.stdout.write(f'Пересчитан рейтинг произведений: {fixed}')
+            elif any(model is Title for _, _, model, _ in datasets):
+                TitleStats.objects.create_empty(list(
+                    Title.objects.filter(stats__isnull=True)
+                    .values_list('pk', flat=True)))
+            if any(model is Comment for _, _, model, _ in datasets):
+                fixed = Review.objects.recalculate_comments()
+                if fixed:
+                    bump_version(*(f'reviews:{title_id}'
+                                   for title_id in set(fixed)))
+                self.stdout.write(
+                    f'Пересчитано количество комментариев: {len(fixed)}')
+            # bulk_create и COPY не отправляют сигналы моделей.
+            # users входит в ETag списков отзывов и комментариев,
+            # поэтому его сброс обновляет их все за одно обращение.
+            bump_version('categories', 'genres', 'titles', 'users',
+                         SEARCH_RESOURCE)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего строк: {total} за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else 0:.0f} строк/с)'
+            + (' [dry-run]' if self.dry_run else '')
+        ))
+
+    def dependents(self, models):
+        """
+        Таблицы вне выбранных, строки которых ссылаются на выбранные.
+        Их очистка не входит в --only, поэтому импорт с --truncate
+        при непустых зависимых таблицах отклоняется.
+        """
+        selected = set(models)
+        for model in models:
+            selected.update(DERIVED.get(model, ()))
+        found = []
+        for model in apps.get_models(include_auto_created=True):
+            if model in selected:
+                continue
+            for field in model._meta.concrete_fields:
+                if (field.is_relation
+                        and field.related_model in selected
+                        and model.objects.exists()):
+                    found.append(model._meta.db_table)
+                    break
+        return found
+
+    def truncate(self, models):
+        """
+        Удаление строк только выбранных таблиц (и их производных)
+        в обратном порядке зависимостей, без каскада на другие таблицы.
+        """
+        dependents = self.dependents(models)
+        if dependents:
+            raise CommandError(
+                'Нельзя очистить выбранные таблицы: на них ссылаются '
+                f'строки в {", ".join(dependents)}. Добавьте эти наборы '
+                'в --only или очистите их отдельно.')
+        user_ids = []
+        if CustomUser in models:
+            user_ids = list(CustomUser.objects.values_list('pk', flat=True))
+        tables = []
+        for model in reversed(models):
+            tables += [derived._meta.db_table
+                       for derived in DERIVED.get(model, ())]
+            tables.append(model._meta.db_table)
+        with transaction.atomic(), connection.cursor() as cursor:
+            for table in tables:
+                cursor.execute(
+                    f'DELETE FROM {connection.ops.quote_name(table)}')
+        # Пользователи в кэше аутентификации воркеров.
+        bump_version(*(user_resource(pk) for pk in user_ids))
+        self.stdout.write(f'Очищены таблицы: {", ".join(tables)}')
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def read_objects(self, path, model, build, maps, stats):
+        known = maps.get(model)
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            for line, row in enumerate(csv.DictReader(csv_file), start=2):
+                if row['id'] in known:
+                    stats['existing'] += 1
+                    continue
+                try:
+                    obj = build(row, maps)
+                except (MissingReference, ValueError) as error:
+                    stats['skipped'] += 1
+                    self.stderr.write(f'{path}:{line}: {error}')
+                    continue
+                maps.add(model, obj.pk)
+                yield obj
+
+    def insert(self, model, objects):
+        if self.use_copy:
+            copy_objects(model, objects)
+        else:
+            with explicit_auto_now_add(model):
+                model.objects.bulk_create(objects)
+
+    def load(self, name, path, model, build, maps):
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден.')
+        stats = {'existing': 0, 'skipped': 0}
+        loaded = 0
+        started = time.monotonic()
+        objects = self.read_objects(path, model, build, maps, stats)
+        with transaction.atomic():
+            for batch in batched(objects, self.batch_size):
+                if not self.dry_run:
+                    self.insert(model, batch)
+                loaded += len(batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{name}: {loaded} строк за {elapsed:.2f} с '
+            f'({loaded / elapsed if elapsed else 0:.0f} строк/с), '
+            f'уже в БД: {stats["existing"]}, пропущено: {stats["skipped"]}'
+        )
+        return loaded
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_version
+from reviews.models import Review
+from titles.models import Title
+
+
+class Command(BaseCommand):
+    """Сверка денормализованных счётчиков отзывов и комментариев."""
+    help = ('Пересчитывает reviews_count произведений (количество оценок) '
+            'и comments_count отзывов по таблицам отзывов и комментариев.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'title_ids', nargs='*', type=int,
+            help='id произведений; по умолчанию - все произведения.'
+        )
+
+    def handle(self, *args, **options):
+        titles = Title.objects.all()
+        reviews = Review.objects.all()
+        if options['title_ids']:
+            titles = titles.filter(pk__in=options['title_ids'])
+            reviews = reviews.filter(title_id__in=options['title_ids'])
+        fixed_titles = titles.recalculate_scores()
+        fixed_reviews = reviews.recalculate_comments()
+        if fixed_titles:
+            bump_version('titles')
+        if fixed_reviews:
+            bump_version(*(f'reviews:{title_id}'
+                           for title_id in set(fixed_reviews)))
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено произведений: {fixed_titles}, '
+            f'отзывов: {len(fixed_reviews)}'))
@@ -1,9 +1,38 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from titles.models import Title
 from users.models import CustomUser
 
 
+class ReviewQuerySet(models.QuerySet):
+    """Операции над денормализованным количеством комментариев."""
+
+    def apply_comments_delta(self, delta):
+        """Атомарное изменение количества комментариев."""
+        return self.update(comments_count=F('comments_count') + delta)
+
+    def recalculate_comments(self):
+        """
+        Пересчёт количества комментариев по таблице комментариев.
+        Возвращает id произведений исправленных отзывов,
+        по одному на каждый отзыв.
+        """
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')).order_by().values('review').annotate(
+            total=Count('pk')).values('total')
+        stale = self.annotate(
+            actual_count=Coalesce(Subquery(comments), 0)
+        ).exclude(comments_count=F('actual_count'))
+        fixed = []
+        for pk, title_id, count in stale.values_list(
+                'pk', 'title_id', 'actual_count').iterator():
+            self.model.objects.filter(pk=pk).update(comments_count=count)
+            fixed.append(title_id)
+        return fixed
+
+
 class Review(models.Model):
     """Отзывы на произведения."""
     title = models.ForeignKey(
@@ -28,6 +57,13 @@ class Review(models.Model):
         verbose_name='Дата отзыва',
         auto_now_add=True,
         db_index=True)
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         ordering = ['pub_date']
@@ -39,10 +75,34 @@ class Review(models.Model):
                 name='unique_title_author'
             ),
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id']),
+            models.Index(fields=['author', 'pub_date', 'id']),
+            models.Index(fields=['title', 'comments_count']),
+        ]
 
     def __str__(self):
         return f'Автор отзыва: {self.author}. Произведение: "{self.title}"'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_score()
+        return instance
+
+    def remember_score(self):
+        """
+        Запоминание сохранённых в БД произведения и оценки.
+        Нужно для пересчёта рейтинга при изменении отзыва.
+        """
+        self._saved_score = (self.__dict__.get('title_id'),
+                             self.__dict__.get('score'))
+
+    def save(self, *args, **kwargs):
+        """Сохранение отзыва и обновление рейтинга в одной транзакции."""
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Комментарии к отзывам."""
@@ -66,6 +126,18 @@ class Comment(models.Model):
         ordering = ['pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id']),
+            models.Index(fields=['author', 'pub_date', 'id']),
+        ]
 
     def __str__(self):
         return f'Комментарий от {self.author} на отзыв "{self.review}"'
+
+    def save(self, *args, **kwargs):
+        """
+        Сохранение комментария и обновление счётчика отзыва
+        в одной транзакции.
+        """
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
@@ -0,0 +1,72 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Comment, Review
+from titles.models import Title, TitleStats
+
+
+def update_title_stats(title_id, deltas):
+    """
+    Изменение гистограммы оценок произведения одним атомарным UPDATE.
+    Строка статистики создаётся вместе с произведением.
+    """
+    TitleStats.objects.apply_scores(title_id, deltas)
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, raw=False, **kwargs):
+    """Пустая статистика оценок нового произведения."""
+    if created and not raw:
+        TitleStats.objects.create_empty([instance.pk])
+
+
+@receiver(post_save, sender=Review)
+def update_title_scores_on_save(sender, instance, created, **kwargs):
+    """Учёт новой или изменённой оценки в рейтинге произведения."""
+    old_title_id, old_score = getattr(instance, '_saved_score', (None, None))
+    if created:
+        Title.objects.filter(pk=instance.title_id).apply_score_delta(
+            instance.score, 1)
+        update_title_stats(instance.title_id, {instance.score: 1})
+    elif old_title_id is None:
+        Title.objects.filter(pk=instance.title_id).recalculate_scores()
+        TitleStats.objects.rebuild([instance.title_id])
+    elif old_title_id != instance.title_id:
+        Title.objects.filter(pk=old_title_id).apply_score_delta(
+            -old_score, -1)
+        Title.objects.filter(pk=instance.title_id).apply_score_delta(
+            instance.score, 1)
+        update_title_stats(old_title_id, {old_score: -1})
+        update_title_stats(instance.title_id, {instance.score: 1})
+    elif old_score != instance.score:
+        Title.objects.filter(pk=instance.title_id).apply_score_delta(
+            instance.score - old_score, 0)
+        update_title_stats(instance.title_id,
+                           {old_score: -1, instance.score: 1})
+    instance.remember_score()
+
+
+@receiver(post_delete, sender=Review)
+def update_title_scores_on_delete(sender, instance, **kwargs):
+    """
+    Исключение оценки удалённого отзыва из рейтинга.
+    Сигнал отправляется и при массовом, и при каскадном удалении.
+    """
+    Title.objects.filter(pk=instance.title_id).apply_score_delta(
+        -instance.score, -1)
+    update_title_stats(instance.title_id, {instance.score: -1})
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, **kwargs):
+    if created:
+        Review.objects.filter(pk=instance.review_id).apply_comments_delta(1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, **kwargs):
+    """
+    Сигнал отправляется и при каскадном удалении отзыва
+    или пользователя; для удалённого отзыва UPDATE ничего не меняет.
+    """
+    Review.objects.filter(pk=instance.review_id).apply_comments_delta(-1)
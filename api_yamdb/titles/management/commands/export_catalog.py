@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import EXPORT_FORMATS, export_catalog
+
+
+class Command(BaseCommand):
+    """Выгрузка каталога с отзывами и комментариями в файл."""
+    help = ('Выгружает произведения с жанрами, категорией, рейтингом, '
+            'отзывами и комментариями в NDJSON или CSV.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', dest='export_format', choices=EXPORT_FORMATS,
+            default='ndjson', help='Формат выгрузки.')
+        parser.add_argument(
+            '--output',
+            help='Файл выгрузки; по умолчанию catalog.<формат>[.gz].')
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимать выгрузку gzip.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Количество произведений в одной пачке запросов.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size должен быть положительным.')
+        output = options['output'] or (
+            f'catalog.{options["export_format"]}'
+            + ('.gz' if options['gzip'] else ''))
+        started = time.monotonic()
+        size = 0
+        with open(output, 'wb') as export_file:
+            for data in export_catalog(
+                    options['export_format'], options['chunk_size'],
+                    compress=options['gzip']):
+                export_file.write(data)
+                size += len(data)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено {size} байт в {output} за {elapsed:.2f} с'))
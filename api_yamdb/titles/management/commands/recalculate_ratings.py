@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_version
+from titles.models import Title, TitleStats
+
+
+class Command(BaseCommand):
+    """Пересчёт денормализованного рейтинга произведений по отзывам."""
+    help = ('Пересчитывает сумму, количество оценок, рейтинг '
+            'и гистограмму оценок произведений.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'title_ids', nargs='*', type=int,
+            help='id произведений; по умолчанию - все произведения.'
+        )
+
+    def handle(self, *args, **options):
+        titles = Title.objects.all()
+        if options['title_ids']:
+            titles = titles.filter(pk__in=options['title_ids'])
+        fixed = titles.recalculate_scores()
+        TitleStats.objects.rebuild(options['title_ids'] or None)
+        if fixed:
+            bump_version('titles')
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено произведений: {fixed}'))
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:50
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_title_scores(apps, schema_editor):
+    Title = apps.get_model('titles', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    scores = (Review.objects.order_by().values('title')
+              .annotate(total=Sum('score'), count=Count('pk')))
+    for row in scores.iterator():
+        Title.objects.filter(pk=row['title']).update(
+            score_sum=row['total'],
+            score_count=row['count'],
+            rating=row['total'] / row['count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0001_initial'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_title_scores, migrations.RunPython.noop),
+    ]
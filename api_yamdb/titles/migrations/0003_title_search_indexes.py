@@ -0,0 +1,39 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS titles_title_name_trgm '
+    'ON titles_title USING gin (name gin_trgm_ops)',
+    "CREATE INDEX IF NOT EXISTS titles_title_name_tsv "
+    "ON titles_title USING gin "
+    "(to_tsvector('russian'::regconfig, COALESCE(name, '')))",
+)
+DROP_SQL = (
+    'DROP INDEX IF EXISTS titles_title_name_tsv',
+    'DROP INDEX IF EXISTS titles_title_name_trgm',
+)
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    GIN-индексы для поиска по названию произведения (api.search).
+    На других СУБД поиск выполняется по индексу в памяти процесса.
+    """
+
+    dependencies = [
+        ('titles', '0002_title_scores'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_postgresql(CREATE_SQL), run_on_postgresql(DROP_SQL)),
+    ]
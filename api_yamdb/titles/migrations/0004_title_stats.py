@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def fill_title_stats(apps, schema_editor):
+    Title = apps.get_model('titles', 'Title')
+    TitleStats = apps.get_model('titles', 'TitleStats')
+    Review = apps.get_model('reviews', 'Review')
+    histograms = {}
+    for title_id, score, total in (Review.objects.order_by()
+                                   .values_list('title_id', 'score')
+                                   .annotate(total=Count('pk'))):
+        histograms.setdefault(title_id, {})[score] = total
+    TitleStats.objects.bulk_create(
+        TitleStats(
+            title_id=title_id,
+            count=sum(histograms.get(title_id, {}).values()),
+            **{f'score_{score}': histograms.get(title_id, {}).get(score, 0)
+               for score in range(1, 11)}
+        )
+        for title_id in Title.objects.values_list('pk', flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0003_title_search_indexes'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='titles.Title', verbose_name='Произведение')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество оценок')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок 10')),
+            ],
+            options={
+                'verbose_name': 'Статистика оценок',
+                'verbose_name_plural': 'Статистика оценок',
+            },
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
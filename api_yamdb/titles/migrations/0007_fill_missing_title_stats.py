@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def fill_missing_title_stats(apps, schema_editor):
+    """
+    Строки статистики произведений, созданных без неё: раньше строка
+    появлялась только с первым отзывом.
+    """
+    Title = apps.get_model('titles', 'Title')
+    TitleStats = apps.get_model('titles', 'TitleStats')
+    Review = apps.get_model('reviews', 'Review')
+    title_ids = list(
+        Title.objects.filter(stats__isnull=True).values_list('pk', flat=True))
+    histograms = {}
+    for title_id, score, total in (Review.objects.order_by()
+                                   .filter(title_id__in=title_ids)
+                                   .values_list('title_id', 'score')
+                                   .annotate(total=Count('pk'))):
+        histograms.setdefault(title_id, {})[score] = total
+    TitleStats.objects.bulk_create((
+        TitleStats(
+            title_id=title_id,
+            count=sum(histograms.get(title_id, {}).values()),
+            **{f'score_{score}': histograms.get(title_id, {}).get(score, 0)
+               for score in range(1, 11)}
+        )
+        for title_id in title_ids
+    ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0006_title_score_count_index'),
+        ('reviews', '0004_review_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_missing_title_stats,
+                             migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
+from django.apps import apps
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models import (Case, Count, ExpressionWrapper, F, FloatField,
+                              OuterRef, Subquery, Sum, When)
+from django.db.models.functions import Cast, Coalesce
 
 from titles.validators import year_validator
 
@@ -46,6 +50,86 @@ class Genre(models.Model):
         return self.name
 
 
+# Порядок произведений с равным рейтингом в рейтинге лучших.
+TOP_TIES = {
+    'reviews': ('-score_count', '-id'),
+    'newest': ('-year', '-id'),
+    'name': ('name', 'id'),
+}
+
+
+class TitleQuerySet(models.QuerySet):
+    """Операции над денормализованным рейтингом произведений."""
+
+    def top(self, min_reviews=1, ties='reviews'):
+        """
+        Произведения по убыванию рейтинга.
+        Читается индекс по (rating, score_count), который обновляется
+        вместе с рейтингом при каждом изменении отзывов.
+        """
+        return self.filter(
+            score_count__gte=max(min_reviews, 1),
+            rating__isnull=False
+        ).order_by('-rating', *TOP_TIES[ties])
+
+    def apply_score_delta(self, score_delta, count_delta):
+        """
+        Атомарное изменение суммы и количества оценок.
+        Рейтинг пересчитывается в том же UPDATE по старым значениям строки.
+        """
+        new_sum = F('score_sum') + score_delta
+        new_count = F('score_count') + count_delta
+        return self.update(
+            score_sum=new_sum,
+            score_count=new_count,
+            rating=Case(
+                When(
+                    score_count__gt=-count_delta,
+                    then=ExpressionWrapper(
+                        Cast(new_sum, FloatField())
+                        / Cast(new_count, FloatField()),
+                        output_field=FloatField()
+                    )
+                ),
+                default=None,
+                output_field=FloatField()
+            )
+        )
+
+    def with_actual_scores(self):
+        """Аннотация фактическими суммой и количеством оценок из отзывов."""
+        review_model = apps.get_model('reviews', 'Review')
+        reviews = review_model.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        return self.annotate(
+            actual_sum=Coalesce(Subquery(
+                reviews.annotate(total=Sum('score')).values('total')), 0),
+            actual_count=Coalesce(Subquery(
+                reviews.annotate(total=Count('pk')).values('total')), 0),
+        )
+
+    def recalculate_scores(self):
+        """
+        Пересчёт суммы, количества оценок и рейтинга по таблице отзывов.
+        Возвращает количество исправленных произведений.
+        """
+        fixed = 0
+        for title in self.with_actual_scores().only(
+                'score_sum', 'score_count', 'rating'):
+            count = title.actual_count
+            rating = title.actual_sum / count if count else None
+            if (title.score_sum, title.score_count, title.rating) == (
+                    title.actual_sum, count, rating):
+                continue
+            type(title).objects.filter(pk=title.pk).update(
+                score_sum=title.actual_sum,
+                score_count=count,
+                rating=rating
+            )
+            fixed += 1
+        return fixed
+
+
 class Title(models.Model):
     """Произведения."""
     name = models.CharField(max_length=500, verbose_name='Название')
@@ -67,11 +151,142 @@ class Title(models.Model):
                                    blank=True,
                                    verbose_name='Жанр произведения',
                                    )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    score_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        blank=True,
+        null=True,
+        editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ('-id',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=['-rating', '-score_count'],
+                         name='title_top_idx'),
+            models.Index(fields=['category', '-rating', '-score_count'],
+                         name='title_category_top_idx'),
+            models.Index(fields=['score_count'],
+                         name='title_score_count_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+
+SCORES = range(1, 11)
+
+
+class TitleStatsQuerySet(models.QuerySet):
+    """Инкрементальное обновление и пересчёт статистики оценок."""
+
+    def apply_scores(self, title_id, deltas):
+        """
+        Атомарное изменение гистограммы одним UPDATE.
+        deltas - изменения числа оценок: {оценка: приращение}.
+        Возвращает количество обновлённых строк (0 - строки ещё нет).
+        """
+        values = {f'score_{score}': F(f'score_{score}') + delta
+                  for score, delta in deltas.items()}
+        return self.filter(title_id=title_id).update(
+            count=F('count') + sum(deltas.values()), **values)
+
+    def create_empty(self, title_ids):
+        """
+        Пустые строки статистики произведений; существующие не меняются.
+        Нужна для вставок без сигналов (bulk_create, COPY).
+        """
+        self.bulk_create(
+            (self.model(title_id=title_id) for title_id in title_ids),
+            batch_size=1000, ignore_conflicts=True)
+
+    def rebuild(self, title_ids=None):
+        """Пересчёт статистики по таблице отзывов."""
+        review_model = apps.get_model('reviews', 'Review')
+        reviews = review_model.objects.order_by()
+        titles = Title.objects.order_by()
+        if title_ids is not None:
+            reviews = reviews.filter(title_id__in=title_ids)
+            titles = titles.filter(pk__in=title_ids)
+        histograms = {}
+        for title_id, score, total in reviews.values_list(
+                'title_id', 'score').annotate(total=Count('pk')):
+            histograms.setdefault(title_id, {})[score] = total
+        for title_id in titles.values_list('pk', flat=True).iterator():
+            histogram = histograms.get(title_id, {})
+            values = {f'score_{score}': histogram.get(score, 0)
+                      for score in SCORES}
+            values['count'] = sum(histogram.values())
+            self.update_or_create(title_id=title_id, defaults=values)
+
+
+class TitleStats(models.Model):
+    """
+    Статистика оценок произведения: гистограмма и количество отзывов.
+    Обновляется сигналами Review (см. reviews.signals).
+    """
+    title = models.OneToOneField(Title,
+                                 primary_key=True,
+                                 related_name='stats',
+                                 on_delete=models.CASCADE,
+                                 verbose_name='Произведение')
+    count = models.PositiveIntegerField('Количество оценок', default=0)
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0)
+
+    objects = TitleStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Статистика оценок'
+        verbose_name_plural = 'Статистика оценок'
+
+    def __str__(self):
+        return f'Статистика оценок: {self.title_id}'
+
+    @property
+    def histogram(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return sum(
+            score * total for score, total in self.histogram.items()
+        ) / self.count
+
+    @property
+    def median(self):
+        """Медиана оценок по гистограмме, как statistics.median."""
+        if not self.count:
+            return None
+        middle = [(self.count - 1) // 2, self.count // 2]
+        values = []
+        seen = 0
+        for score, total in self.histogram.items():
+            seen += total
+            while middle and middle[0] < seen:
+                values.append(score)
+                middle.pop(0)
+        return sum(values) / 2
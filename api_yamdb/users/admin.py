@@ -1,6 +1,6 @@
 from django.contrib.admin import ModelAdmin, register
 
-from users.models import CustomUser
+from users.models import CustomUser, OutgoingEmail
 
 ModelAdmin.empty_value_display = '-пусто-'
 
@@ -12,3 +12,13 @@ class UserAdmin(ModelAdmin):
         'first_name', 'last_name', 'confirmation_code')
     list_editable = ('role',)
     search_fields = ('username', 'email')
+
+
+@register(OutgoingEmail)
+class OutgoingEmailAdmin(ModelAdmin):
+    list_display = (
+        'pk', 'recipient', 'subject', 'status', 'attempts',
+        'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+    exclude = ('body',)
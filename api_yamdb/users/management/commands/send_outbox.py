@@ -0,0 +1,148 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+def send_chunk(emails):
+    """
+    Отправка части пачки через одно соединение с почтовым сервером.
+    Возвращает пары (id письма, текст ошибки или None).
+    Работает только с уже загруженными данными, без обращений к БД.
+    """
+    results = []
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as error:
+        return [(email['pk'], repr(error)) for email in emails]
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email['subject'],
+                body=email['body'],
+                from_email=email['from_email'],
+                to=(email['recipient'],),
+                connection=connection
+            )
+            try:
+                message.send()
+            except Exception as error:
+                results.append((email['pk'], repr(error)))
+            else:
+                results.append((email['pk'], None))
+    finally:
+        connection.close()
+    return results
+
+
+class Command(BaseCommand):
+    """Отправка писем из очереди OutgoingEmail."""
+    help = ('Отправляет письма из outbox пачками в пуле потоков '
+            'с повторными попытками и переводом в dead после лимита.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Количество писем, забираемых за один проход.')
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество потоков отправки.')
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='После стольких неудач письмо переводится в dead.')
+        parser.add_argument(
+            '--backoff', type=int, default=30,
+            help='Базовая задержка повтора в секундах (удваивается).')
+        parser.add_argument(
+            '--lease', type=int, default=300,
+            help='На сколько секунд забранное письмо скрыто '
+                 'от других обработчиков.')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, опрашивая очередь.')
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='Пауза между опросами пустой очереди в режиме --loop.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                processed = self.process_batch(pool)
+                if not options['loop']:
+                    break
+                if not processed:
+                    time.sleep(options['interval'])
+
+    def claim_batch(self):
+        """
+        Выборка пачки готовых к отправке писем.
+        Срок следующей попытки сдвигается на время аренды, поэтому
+        параллельные обработчики не возьмут те же письма, а письма
+        упавшего обработчика вернутся в очередь после её окончания.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutgoingEmail.objects.select_for_update(skip_locked=True)
+                .filter(status=OutgoingEmail.PENDING,
+                        next_attempt_at__lte=now)
+                .order_by('next_attempt_at')
+                .values('pk', 'subject', 'body', 'from_email', 'recipient',
+                        'attempts')[:self.options['batch_size']]
+            )
+            OutgoingEmail.objects.filter(
+                pk__in=[email['pk'] for email in emails]
+            ).update(next_attempt_at=now + timedelta(
+                seconds=self.options['lease']))
+        return emails
+
+    def process_batch(self, pool):
+        emails = self.claim_batch()
+        if not emails:
+            return 0
+        workers = self.options['workers']
+        chunks = [emails[i::workers] for i in range(workers)]
+        results = []
+        for chunk_results in pool.map(send_chunk, filter(None, chunks)):
+            results.extend(chunk_results)
+        self.save_results(emails, results)
+        return len(emails)
+
+    def save_results(self, emails, results):
+        """
+        Сохранение итогов отправки. Текст отправленных и dead-писем
+        стирается: в нём код подтверждения, хранить его после
+        отправки незачем.
+        """
+        now = timezone.now()
+        attempts = {email['pk']: email['attempts'] + 1 for email in emails}
+        sent = [pk for pk, error in results if error is None]
+        OutgoingEmail.objects.filter(pk__in=sent).update(
+            status=OutgoingEmail.SENT, sent_at=now,
+            attempts=F('attempts') + 1, last_error='', body='')
+        dead = 0
+        for pk, error in results:
+            if error is None:
+                continue
+            if attempts[pk] >= self.options['max_attempts']:
+                status = OutgoingEmail.DEAD
+                dead += 1
+            else:
+                status = OutgoingEmail.PENDING
+            delay = self.options['backoff'] * 2 ** (attempts[pk] - 1)
+            fields = {'body': ''} if status == OutgoingEmail.DEAD else {}
+            OutgoingEmail.objects.filter(pk=pk).update(
+                status=status, attempts=attempts[pk], last_error=error,
+                next_attempt_at=now + timedelta(seconds=delay), **fields)
+        self.stdout.write(
+            f'Отправлено: {len(sent)}, ошибок: {len(results) - len(sent)}, '
+            f'в dead: {dead}')
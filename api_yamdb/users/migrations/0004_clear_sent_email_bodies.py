@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def clear_sent_email_bodies(apps, schema_editor):
+    """Код подтверждения в уже отправленных и dead-письмах больше не нужен."""
+    OutgoingEmail = apps.get_model('users', 'OutgoingEmail')
+    OutgoingEmail.objects.filter(status__in=('sent', 'dead')).update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_sent_email_bodies,
+                             migrations.RunPython.noop),
+    ]
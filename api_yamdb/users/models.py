@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class CustomUser(AbstractUser):
@@ -51,6 +52,20 @@ class CustomUser(AbstractUser):
         null=True
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_username()
+        return instance
+
+    def remember_username(self):
+        """
+        Запоминание сохранённого в БД имени пользователя.
+        Имя выводится как автор отзывов и комментариев: кэш и ETag
+        их списков сбрасываются только при его изменении.
+        """
+        self._saved_username = self.__dict__.get('username')
+
     @property
     def is_user(self):
         return self.role == self.USER
@@ -68,3 +83,70 @@ class CustomUser(AbstractUser):
         ordering = ('username',)
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
+
+
+class OutgoingEmail(models.Model):
+    """
+    Исходящее письмо в очереди (outbox).
+    Записывается в одной транзакции с изменением данных,
+    отправляется командой send_outbox.
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    DEAD = 'dead'
+    STATUSES = [
+        (PENDING, 'pending'),
+        (SENT, 'sent'),
+        (DEAD, 'dead'),
+    ]
+    recipient = models.EmailField(
+        'Получатель',
+        max_length=150
+    )
+    subject = models.CharField(
+        'Тема',
+        max_length=255
+    )
+    body = models.TextField('Текст')
+    from_email = models.EmailField(
+        'Отправитель',
+        max_length=150
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Попыток отправки',
+        default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    last_error = models.TextField(
+        'Последняя ошибка',
+        blank=True
+    )
+    created = models.DateTimeField(
+        'Создано',
+        auto_now_add=True
+    )
+    sent_at = models.DateTimeField(
+        'Отправлено',
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        ordering = ('next_attempt_at',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient} ({self.status})'
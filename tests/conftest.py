@@ -1,9 +1,45 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    """Тесты с БД выполняются на SQLite в памяти, без сервера PostgreSQL."""
+    from django.db import connections
+
+    connections.databases = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+    }
+    connections.ensure_defaults('default')
+    connections.prepare_test_settings('default')
+    if hasattr(connections._connections, 'default'):
+        del connections['default']
+
+
+@pytest.fixture(scope='session', autouse=True)
+def local_memory_cache():
+    """
+    Кэш в памяти процесса: файловый кэш из настроек сохранял бы версии
+    и ответы между запусками тестов.
+    """
+    from django.conf import settings
+    from django.test import override_settings
+
+    caches = {**settings.CACHES, 'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yamdb-tests',
+    }}
+    with override_settings(CACHES=caches):
+        yield
@@ -0,0 +1,86 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.throttling import AuthRateThrottle, IPRateThrottle
+
+from users.models import CustomUser, OutgoingEmail
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture(autouse=True)
+def clear_throttle_cache():
+    caches['throttle'].clear()
+
+
+def signup(username, email, ip='10.0.0.1'):
+    return APIClient().post(
+        SIGNUP_URL, {'username': username, 'email': email},
+        REMOTE_ADDR=ip)
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+
+    @override_settings(AUTH_THROTTLE_RATES={
+        'ip': None, 'username': '2/min', 'email': '2/min'})
+    def test_signup_throttled_by_username_and_email(self):
+        # Повторная регистрация отклоняется валидацией, но учитывается.
+        assert signup('bot', 'bot@yamdb.fake', '10.0.0.1').status_code == 200
+        assert signup('bot', 'bot2@yamdb.fake', '10.0.0.2').status_code == 400
+        users, emails = CustomUser.objects.count(), OutgoingEmail.objects.count()
+        response = signup('BOT', 'bot3@yamdb.fake', '10.0.0.3')
+        assert response.status_code == 429
+        assert 'Retry-After' in response
+        assert signup('bot4', 'bot@yamdb.fake').status_code == 400
+        assert signup('bot5', ' Bot@yamdb.fake').status_code == 429
+        assert (CustomUser.objects.count(),
+                OutgoingEmail.objects.count()) == (users, emails), (
+            'Проверьте, что отклонённый запрос не пишет в БД')
+        assert signup('other', 'other@yamdb.fake').status_code == 200
+
+    @override_settings(AUTH_THROTTLE_RATES={'ip': '2/min'})
+    def test_signup_and_token_throttled_by_ip(self):
+        for i in range(2):
+            assert signup(f'user{i}', f'user{i}@yamdb.fake').status_code == 200
+        assert signup('user2', 'user2@yamdb.fake').status_code == 429
+        assert signup(
+            'user2', 'user2@yamdb.fake', '10.0.0.2').status_code == 200
+        response = APIClient().post(
+            TOKEN_URL, {'username': 'user0', 'confirmation_code': 'x'},
+            REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == 400, (
+            'Проверьте, что у регистрации и токена раздельные счётчики')
+
+
+@override_settings(AUTH_THROTTLE_RATES={'ip': '10/min'})
+def test_parallel_requests_counted_once_each():
+    view = SimpleNamespace(throttle_scope='signup')
+    allowed = []
+
+    def post():
+        for _ in range(10):
+            request = Request(APIRequestFactory().post(
+                SIGNUP_URL, REMOTE_ADDR='10.0.0.9'))
+            allowed.append(IPRateThrottle().allow_request(request, view))
+
+    threads = [threading.Thread(target=post) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert allowed.count(True) == 10, (
+        'Проверьте, что параллельные запросы не затирают историю')
+
+
+def test_base_throttle_does_not_limit():
+    request = Request(APIRequestFactory().post(SIGNUP_URL))
+    throttle = AuthRateThrottle()
+    assert throttle.get_ident_value(request) is None
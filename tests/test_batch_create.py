@@ -0,0 +1,164 @@
+from unittest import mock
+
+import pytest
+from django.db import DatabaseError, transaction
+from rest_framework.test import APIClient
+
+from api.cache import get_versions
+from api.registry import catalog_registry
+from api.search import SEARCH_RESOURCE
+from api.views import TitleViewSet
+from titles.models import Category, Genre, Title, TitleStats
+from users.models import CustomUser
+
+
+def admin_client():
+    admin = CustomUser.objects.create(
+        username='batch_admin', email='batch_admin@yamdb.fake',
+        role=CustomUser.ADMIN)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def title_item(name, genre=('drama',), category='movie'):
+    return {'name': name, 'year': 2000, 'genre': list(genre),
+            'category': category}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleBatch:
+
+    def test_versions_bumped_after_commit(self):
+        Category.objects.create(name='Кино', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        client = admin_client()
+        before = get_versions('titles', SEARCH_RESOURCE)
+        with transaction.atomic():
+            response = client.post(
+                '/api/v1/titles/batch/', [title_item('Первое')],
+                format='json')
+            assert response.status_code == 201
+            assert get_versions('titles', SEARCH_RESOURCE) == before
+        after = get_versions('titles', SEARCH_RESOURCE)
+        assert all(new > old for new, old in zip(after, before))
+
+    def test_titles_and_genre_links_created(self):
+        Category.objects.create(name='Кино', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        response = admin_client().post('/api/v1/titles/batch/', [
+            title_item('Первое', genre=('drama', 'comedy', 'drama')),
+            title_item('Второе', genre=('comedy',)),
+        ], format='json')
+        assert response.status_code == 201
+        assert [item['genre'] for item in response.data] == [
+            ['drama', 'comedy'], ['comedy']]
+        links = Title.genre.through.objects.values_list(
+            'title__name', 'genre__slug')
+        assert sorted(links) == [
+            ('Второе', 'comedy'), ('Первое', 'comedy'), ('Первое', 'drama')
+        ], 'Проверьте связи произведений с жанрами'
+        assert [item['id'] for item in response.data] == list(
+            Title.objects.order_by('pk').values_list('pk', flat=True))
+        assert TitleStats.objects.filter(
+            title_id__in=[item['id'] for item in response.data],
+            count=0).count() == 2, (
+            'Проверьте, что статистика создаётся для пакета произведений')
+
+    def test_errors_per_item(self):
+        Category.objects.create(name='Кино', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        response = admin_client().post('/api/v1/titles/batch/', [
+            title_item('Первое'),
+            title_item('Второе', genre=('unknown',)),
+            title_item('Третье', category='unknown'),
+            {'name': 'Четвёртое'},
+        ], format='json')
+        assert response.status_code == 400
+        assert len(response.data) == 4, (
+            'Проверьте, что ошибки возвращаются списком длины запроса')
+        assert response.data[0] == {}
+        assert list(response.data[1]) == ['genre']
+        assert list(response.data[2]) == ['category']
+        assert {'year', 'genre', 'category'} <= set(response.data[3])
+        assert not Title.objects.exists(), (
+            'Проверьте, что пакет с ошибками не сохраняется')
+
+    def test_rollback_on_failure(self):
+        Category.objects.create(name='Кино', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        client = admin_client()
+        before = get_versions('titles', SEARCH_RESOURCE)
+        links = Title.genre.through.objects
+        with mock.patch.object(links, 'bulk_create',
+                               side_effect=DatabaseError('сбой')):
+            with pytest.raises(DatabaseError):
+                client.post('/api/v1/titles/batch/', [
+                    title_item('Первое'), title_item('Второе')],
+                    format='json')
+        assert not Title.objects.exists(), (
+            'Проверьте, что пакет сохраняется в одной транзакции')
+        assert get_versions('titles', SEARCH_RESOURCE) == before
+
+    def test_batch_limits(self):
+        client = admin_client()
+        response = client.post(
+            '/api/v1/titles/batch/', title_item('Первое'), format='json')
+        assert response.status_code == 400
+        with mock.patch.object(TitleViewSet, 'batch_max_size', 1):
+            response = client.post('/api/v1/titles/batch/', [
+                title_item('Первое'), title_item('Второе')], format='json')
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSlugBatch:
+
+    @pytest.mark.parametrize('url, model', (
+        ('/api/v1/categories/batch/', Category),
+        ('/api/v1/genres/batch/', Genre),
+    ))
+    def test_duplicate_slugs(self, url, model):
+        model.objects.create(name='Было', slug='old')
+        response = admin_client().post(url, [
+            {'name': 'Новое', 'slug': 'new'},
+            {'name': 'Повтор', 'slug': 'new'},
+            {'name': 'Старое', 'slug': 'old'},
+            {'name': 'Без slug'},
+        ], format='json')
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert list(response.data[1]) == ['slug'], (
+            'Проверьте повтор slug внутри пакета')
+        assert list(response.data[2]) == ['slug'], (
+            'Проверьте повтор slug, уже существующего в БД')
+        assert list(response.data[3]) == ['slug']
+        assert list(model.objects.values_list('slug', flat=True)) == ['old']
+
+    @pytest.mark.parametrize('url, model, resource', (
+        ('/api/v1/categories/batch/', Category, 'categories'),
+        ('/api/v1/genres/batch/', Genre, 'genres'),
+    ))
+    def test_created_and_versions_bumped_after_commit(
+            self, url, model, resource):
+        client = admin_client()
+        before = get_versions(resource, 'titles')
+        with transaction.atomic():
+            response = client.post(url, [
+                {'name': 'Первый', 'slug': 'first'},
+                {'name': 'Второй', 'slug': 'second'},
+            ], format='json')
+            assert response.status_code == 201
+            assert get_versions(resource, 'titles') == before, (
+                'Проверьте, что версии меняются после фиксации транзакции')
+        assert [item['slug'] for item in response.data] == [
+            'first', 'second']
+        assert model.objects.count() == 2
+        after = get_versions(resource, 'titles')
+        assert all(new > old for new, old in zip(after, before))
+        catalog_registry.ensure_current()
+        ids = (catalog_registry.category_ids if model is Category
+               else catalog_registry.genre_ids)
+        assert {'first', 'second'} <= set(ids), (
+            'Проверьте, что справочник видит созданные объекты')
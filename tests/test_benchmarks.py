@@ -0,0 +1,81 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from benchmarks.harness import percentile
+from benchmarks.report import compare
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title, TitleStats
+from users.models import CustomUser
+
+TINY = {
+    'titles': 3, 'users': 2, 'reviews_per_title': 1,
+    'comments_per_review': 1, 'genres_per_title': 1,
+}
+
+
+def result(p50, queries=2.0):
+    return {'p50_ms': p50, 'p95_ms': p50 * 2, 'p99_ms': p50 * 3,
+            'queries_per_request': queries}
+
+
+def run_benchmark(tmp_path, **options):
+    output = tmp_path / 'benchmark.json'
+    call_command('benchmark', scenario=['titles-list', 'titles-detail'],
+                 iterations=3, warmup=1, output=str(output),
+                 stdout=StringIO(), **TINY, **options)
+    return json.loads(output.read_text(encoding='utf-8'))
+
+
+@pytest.mark.parametrize('fraction, expected', [
+    (0, 1), (0.5, 3), (0.75, 4), (0.9, 4.6), (1, 5),
+])
+def test_percentile(fraction, expected):
+    assert percentile([5, 1, 4, 2, 3], fraction) == pytest.approx(expected)
+    assert percentile([7], fraction) == 7
+
+
+def test_compare():
+    baseline = {'scenarios': {'titles-list': result(10.0),
+                              'removed': result(1.0)}}
+    current = {'scenarios': {'titles-list': result(11.0),
+                             'added': result(100.0)}}
+    assert compare(current, baseline, 0.2) == [], (
+        'Проверьте, что рост в пределах tolerance не считается регрессией')
+    current['scenarios']['titles-list'] = result(13.0, queries=3.0)
+    assert compare(current, baseline, 0.2) == [
+        'titles-list: p50_ms 10.00 -> 13.00',
+        'titles-list: p95_ms 20.00 -> 26.00',
+        'titles-list: p99_ms 30.00 -> 39.00',
+        'titles-list: queries_per_request 2.00 -> 3.00',
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchmarkCommand:
+
+    def test_generated_data_rolled_back(self, tmp_path):
+        results = run_benchmark(tmp_path)
+        assert set(results['scenarios']) == {'titles-list', 'titles-detail'}
+        assert results['scenarios']['titles-list']['requests'] == 3
+        assert results['meta']['scale']['titles'] == 3
+        for model in (Category, Genre, Title, TitleStats, CustomUser,
+                      Review, Comment):
+            assert not model.objects.exists(), (
+                f'Проверьте, что данные бенчмарка ({model.__name__}) '
+                f'удаляются после замеров')
+
+    def test_keep_data(self, tmp_path):
+        run_benchmark(tmp_path, keep_data=True, seed=7)
+        assert Title.objects.filter(name__startswith='bench7 ').count() == 3
+        assert TitleStats.objects.count() == 3
+
+    def test_regression_against_baseline(self, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        baseline.write_text(json.dumps({'scenarios': {
+            'titles-list': result(0.0, queries=0.0)}}), encoding='utf-8')
+        with pytest.raises(CommandError, match='titles-list: p50_ms'):
+            run_benchmark(tmp_path, baseline=str(baseline))
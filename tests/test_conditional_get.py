@@ -0,0 +1,61 @@
+import pytest
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+from reviews.models import Review
+from titles.models import Title
+from users.models import CustomUser
+
+
+def create_review():
+    title = Title.objects.create(name='Произведение', year=2000)
+    author = CustomUser.objects.create(
+        username='author', email='author@yamdb.fake')
+    return Review.objects.create(
+        title=title, author=author, text='Отзыв', score=7)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    def get(self, url, **headers):
+        return APIClient().get(url, **headers)
+
+    def test_reviews_not_modified_until_change(self):
+        caches['throttle'].clear()
+        review = create_review()
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        response = self.get(url)
+        etag = response['ETag']
+        assert response.status_code == 200
+        assert self.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        APIClient().post('/api/v1/auth/signup/', {
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'})
+        newcomer = CustomUser.objects.get(username='newcomer')
+        newcomer.bio = 'Обо мне'
+        newcomer.save()
+        assert self.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+            'Проверьте, что регистрация не сбрасывает ETag отзывов')
+
+        author = CustomUser.objects.get(pk=review.author_id)
+        author.username = 'renamed'
+        author.save()
+        response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data['results'][0]['author'] == 'renamed'
+
+        etag = response['ETag']
+        Review.objects.filter(pk=review.pk).get().delete()
+        assert self.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_last_modified(self):
+        review = create_review()
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+        response = self.get(url)
+        last_modified = response['Last-Modified']
+        response = self.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+        response = self.get(
+            url, HTTP_IF_MODIFIED_SINCE='Sat, 01 Jan 2000 00:00:00 GMT')
+        assert response.status_code == 200
@@ -0,0 +1,63 @@
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from reviews.models import Comment, Review
+from titles.models import Title
+from users.models import CustomUser
+
+
+def create_reviews(title, count):
+    return [
+        Review.objects.create(
+            title=title, text='Отзыв', score=5,
+            author=CustomUser.objects.create(
+                username=f'{title.pk}_{i}', email=f'{title.pk}_{i}@y.fake'))
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestCounters:
+
+    def test_counters_follow_creates_and_cascades(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        first, second = create_reviews(title, 2)
+        commenter = CustomUser.objects.create(
+            username='commenter', email='commenter@y.fake')
+        for author in (commenter, first.author, second.author):
+            Comment.objects.create(review=first, author=author, text='К')
+        Comment.objects.create(review=second, author=commenter, text='К')
+        first.refresh_from_db()
+        assert first.comments_count == 3
+        commenter.delete()
+        first.refresh_from_db()
+        assert first.comments_count == 2, (
+            'Проверьте, что каскадное удаление уменьшает comments_count')
+        Comment.objects.filter(author=first.author).delete()
+        first.refresh_from_db()
+        assert first.comments_count == 1
+        second.delete()
+        response = APIClient().get(f'/api/v1/titles/{title.pk}/')
+        assert response.data['reviews_count'] == 1
+        response = APIClient().get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.data['results'][0]['comments_count'] == 1
+
+    def test_ordering_and_reconciliation(self):
+        quiet, popular = (
+            Title.objects.create(name=name, year=2000)
+            for name in ('Тихое', 'Популярное'))
+        create_reviews(quiet, 1)
+        review, _ = create_reviews(popular, 2)
+        response = APIClient().get('/api/v1/titles/?ordering=-reviews_count')
+        assert [item['id'] for item in response.data['results']] == [
+            popular.pk, quiet.pk]
+        Comment.objects.bulk_create(
+            Comment(review=review, author=review.author, text='К')
+            for _ in range(2))
+        Review.objects.filter(pk=review.pk).update(comments_count=7)
+        Title.objects.filter(pk=quiet.pk).update(score_count=5)
+        call_command('recalculate_counters')
+        review.refresh_from_db()
+        quiet.refresh_from_db()
+        assert (review.comments_count, quiet.score_count) == (2, 1)
@@ -0,0 +1,125 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from api.export import accepts_gzip
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title
+from users.models import CustomUser
+
+EXPORT_URL = '/api/v1/titles/export/'
+
+
+def create_catalog():
+    category = Category.objects.create(name='Кино', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    author = CustomUser.objects.create(
+        username='exporter', email='exporter@yamdb.fake')
+    titles = []
+    for i in range(3):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=category)
+        title.genre.set([genre])
+        titles.append(title)
+    review = Review.objects.create(
+        title=titles[0], author=author, text='Отзыв', score=8)
+    Comment.objects.create(review=review, author=author, text='Комментарий')
+    return titles
+
+
+def admin_client():
+    admin = CustomUser.objects.create(
+        username='export_admin', email='export_admin@yamdb.fake',
+        role=CustomUser.ADMIN)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def read_ndjson(data):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', True),
+    ('gzip, deflate, br', True),
+    ('deflate;q=1.0, gzip;q=0.5', True),
+    ('gzip;q=0', False),
+    ('GZIP; q=0.0, *', False),
+    ('*', True),
+    ('*;q=0', False),
+    ('identity', False),
+    ('', False),
+    ('gzip;q=abc', False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExportEndpoint:
+
+    def test_plain_ndjson(self):
+        titles = create_catalog()
+        response = admin_client().get(EXPORT_URL)
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response
+        assert 'Accept-Encoding' in response['Vary']
+        rows = read_ndjson(b''.join(response.streaming_content))
+        assert [row['id'] for row in rows] == [title.pk for title in titles]
+        assert rows[0]['category'] == {'name': 'Кино', 'slug': 'movie'}
+        assert rows[0]['reviews'][0]['comments'][0]['text'] == 'Комментарий'
+
+    def test_gzip_csv(self):
+        create_catalog()
+        response = admin_client().get(
+            EXPORT_URL, {'export_format': 'csv'},
+            HTTP_ACCEPT_ENCODING='gzip, deflate')
+        assert response['Content-Encoding'] == 'gzip'
+        content = gzip.decompress(b''.join(response.streaming_content))
+        records = [row['record'] for row in csv.DictReader(
+            io.StringIO(content.decode()))]
+        assert records == ['title', 'review', 'comment', 'title', 'title']
+
+    def test_gzip_refused(self):
+        create_catalog()
+        response = admin_client().get(
+            EXPORT_URL, HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        assert 'Content-Encoding' not in response, (
+            'Проверьте, что gzip;q=0 запрещает сжатие')
+        assert len(read_ndjson(b''.join(response.streaming_content))) == 3
+
+    def test_permissions_and_format(self):
+        assert APIClient().get(EXPORT_URL).status_code == 401
+        response = admin_client().get(EXPORT_URL, {'export_format': 'xml'})
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExportCommand:
+
+    def test_ndjson_file(self, tmp_path):
+        titles = create_catalog()
+        output = tmp_path / 'catalog.ndjson'
+        out = io.StringIO()
+        call_command('export_catalog', output=str(output), chunk_size=2,
+                     stdout=out)
+        rows = read_ndjson(output.read_bytes())
+        assert [row['id'] for row in rows] == [title.pk for title in titles]
+        assert f'в {output}' in out.getvalue()
+
+    def test_gzip_csv_file(self, tmp_path):
+        create_catalog()
+        output = tmp_path / 'catalog.csv.gz'
+        call_command('export_catalog', export_format='csv', gzip=True,
+                     output=str(output), stdout=io.StringIO())
+        with gzip.open(output, 'rt') as export_file:
+            rows = list(csv.DictReader(export_file))
+        assert [row['name'] for row in rows if row['record'] == 'title'] == [
+            'Произведение 0', 'Произведение 1', 'Произведение 2']
+        assert rows[0]['genre'] == 'drama'
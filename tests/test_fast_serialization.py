@@ -0,0 +1,51 @@
+import pytest
+from django.test import override_settings
+
+from reviews.models import Comment, Review
+from tests.test_query_budget import admin_client, create_catalog
+from titles.models import Title
+
+URLS = (
+    lambda title, review: '/api/v1/titles/',
+    lambda title, review: '/api/v1/titles/?fields=id,genre,rating',
+    lambda title, review: '/api/v1/titles/?omit=genre&limit=3&offset=2',
+    lambda title, review: '/api/v1/titles/?genre=genre-1&name=Произведение',
+    lambda title, review: '/api/v1/titles/?ordering=-reviews_count,name',
+    lambda title, review: f'/api/v1/titles/{title.pk}/reviews/',
+    lambda title, review:
+    f'/api/v1/titles/{title.pk}/reviews/?ordering=-comments_count',
+    lambda title, review:
+    f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor&page_size=5',
+    lambda title, review:
+    f'/api/v1/titles/{title.pk}/reviews/?fields=title,author,pub_date',
+    lambda title, review:
+    f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+    lambda title, review:
+    f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/?compact=true',
+    lambda title, review:
+    f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+    f'?pagination=cursor&page_size=4&omit=text',
+)
+
+
+@pytest.mark.django_db
+class TestFastSerialization:
+
+    @pytest.mark.parametrize('url', URLS)
+    def test_fast_list_matches_serializers(self, url):
+        title, review = create_catalog(12)
+        Title.objects.create(
+            name='Без категории', year=1999, description='Описание')
+        Review.objects.filter(pk=review.pk).update(text='Текст "в кавычках"')
+        Comment.objects.filter(review=review).update(text='Комментарий\n')
+        client = admin_client()
+        path = url(title, review)
+        with override_settings(API_FAST_LIST=False):
+            expected = client.get(path)
+        with override_settings(API_FAST_LIST=True):
+            response = client.get(path)
+        assert response.status_code == expected.status_code == 200
+        assert response.content == expected.content, (
+            f'Проверьте, что быстрый вывод {path} совпадает '
+            f'с выводом сериализатора'
+        )
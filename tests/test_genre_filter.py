@@ -0,0 +1,46 @@
+import pytest
+from rest_framework.test import APIClient
+
+from titles.models import Genre, Title
+
+
+def get_ids(query):
+    response = APIClient().get(f'/api/v1/titles/?{query}')
+    assert response.status_code == 200, response.data
+    return {item['id'] for item in response.data['results']}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGenreFilter:
+
+    def test_genre_modes_follow_genre_changes(self):
+        drama, comedy, horror = (
+            Genre.objects.create(name=slug, slug=slug)
+            for slug in ('drama', 'comedy', 'horror'))
+        both, only_drama, only_comedy = (
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(3))
+        both.genre.set([drama, comedy])
+        only_drama.genre.add(drama)
+        comedy.titles.add(only_comedy)
+        assert get_ids('genre=drama,comedy&genre_mode=all') == {both.pk}
+        assert get_ids('genre=drama,comedy') == {
+            both.pk, only_drama.pk, only_comedy.pk}
+        assert get_ids('genre=drama,unknown&genre_mode=all') == set()
+        assert get_ids('genre=horror,unknown') == set()
+
+        only_drama.genre.add(comedy)
+        comedy.titles.remove(both)
+        assert get_ids('genre=drama,comedy&genre_mode=all') == {
+            only_drama.pk}
+        only_drama.genre.clear()
+        comedy.titles.clear()
+        assert get_ids('genre=drama,comedy') == {both.pk}
+        horror.titles.add(only_drama, only_comedy)
+        only_drama.delete()
+        drama.delete()
+        assert get_ids('genre=comedy,horror') == {only_comedy.pk}
+
+    def test_genre_mode_validation(self):
+        response = APIClient().get('/api/v1/titles/?genre=a,b&genre_mode=x')
+        assert response.status_code == 400
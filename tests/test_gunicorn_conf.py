@@ -0,0 +1,92 @@
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.db import DatabaseError
+
+from api.registry import catalog_registry
+from api_yamdb import gunicorn_conf, warmup
+from titles.models import Category
+
+
+@pytest.fixture
+def load_conf(monkeypatch):
+    def load(**env):
+        for name in ('GUNICORN_THREADS', 'GUNICORN_WORKER_CLASS'):
+            monkeypatch.delenv(name, raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return importlib.reload(gunicorn_conf)
+
+    yield load
+    monkeypatch.undo()
+    importlib.reload(gunicorn_conf)
+
+
+def make_worker(threads, pool=None):
+    worker = SimpleNamespace(
+        cfg=SimpleNamespace(threads=threads, timeout=5),
+        log=mock.Mock(), started=time.monotonic())
+    if pool is not None:
+        worker.tpool = pool
+    return worker
+
+
+class TestGunicornConf:
+
+    def test_worker_class_selection(self, load_conf):
+        conf = load_conf()
+        assert (conf.worker_class, conf.threads) == ('gthread', 4)
+        conf = load_conf(GUNICORN_THREADS='1')
+        assert conf.worker_class == 'sync'
+        conf = load_conf(GUNICORN_THREADS='1', GUNICORN_WORKER_CLASS='gevent')
+        assert conf.worker_class == 'gevent'
+
+    def test_sync_worker_connects_once(self):
+        with mock.patch.object(warmup, 'connect') as connect:
+            gunicorn_conf.post_worker_init(make_worker(1))
+        assert connect.call_count == 1
+
+    def test_gthread_worker_connects_in_every_thread(self):
+        threads = set()
+
+        def connect():
+            threads.add(threading.get_ident())
+            return True
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            worker = make_worker(4, pool)
+            with mock.patch.object(warmup, 'connect', side_effect=connect):
+                gunicorn_conf.post_worker_init(worker)
+        assert len(threads) == 4, (
+            'Проверьте, что соединение открывается в каждом потоке gthread')
+        worker.log.warning.assert_not_called()
+
+    def test_when_ready_runs_warmup_with_preload(self):
+        server = SimpleNamespace(
+            cfg=SimpleNamespace(preload_app=True), log=mock.Mock())
+        with mock.patch.object(warmup, 'warmup', return_value=0.5) as run:
+            gunicorn_conf.when_ready(server)
+            server.cfg.preload_app = False
+            gunicorn_conf.when_ready(server)
+        assert run.call_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warmup_loads_registry_and_closes_connections():
+    Category.objects.create(name='Кино', slug='movie')
+    catalog_registry.version = None
+    with mock.patch.object(warmup.connections, 'close_all') as close_all:
+        assert warmup.warmup() >= 0
+    assert 'movie' in catalog_registry.category_ids
+    close_all.assert_called_once_with()
+
+
+def test_connect_survives_unavailable_database():
+    with mock.patch.object(warmup.connection, 'ensure_connection',
+                           side_effect=DatabaseError('нет соединения')):
+        assert warmup.connect() is False
@@ -0,0 +1,84 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from api.cache import get_versions
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title, TitleStats
+from users.models import CustomUser
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def csv_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8',
+              newline='') as csv_file:
+        return len(list(csv.DictReader(csv_file)))
+
+
+def import_csv(*args, **options):
+    out = StringIO()
+    call_command('import_csv', *args, stdout=out, stderr=StringIO(),
+                 **options)
+    return out.getvalue()
+
+
+def counts():
+    return {model: model.objects.count() for model in (
+        CustomUser, Category, Genre, Title, Title.genre.through,
+        Review, Comment, TitleStats)}
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+
+    def test_dry_run(self):
+        output = import_csv(dry_run=True)
+        assert '[dry-run]' in output
+        assert f'titles: {csv_rows("titles.csv")} строк' in output
+        assert not any(counts().values()), (
+            'Проверьте, что --dry-run ничего не пишет в БД')
+
+    def test_import_and_idempotent_rerun(self):
+        import_csv()
+        loaded = counts()
+        assert loaded[Title] == csv_rows('titles.csv')
+        assert loaded[Review] == csv_rows('review.csv')
+        assert loaded[Comment] == csv_rows('comments.csv')
+        assert loaded[TitleStats] == loaded[Title]
+        title = Title.objects.filter(score_count__gt=0).first()
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert title.rating == sum(scores) / len(scores)
+        output = import_csv()
+        assert counts() == loaded, (
+            'Проверьте, что повторный импорт не создаёт дубликаты')
+        assert f'уже в БД: {csv_rows("review.csv")}' in output
+
+    def test_truncate_selected_tables(self):
+        import_csv()
+        loaded = counts()
+        Review.objects.filter(pk=Review.objects.first().pk).delete()
+        Title.objects.update(rating=None, score_count=0, score_sum=0)
+        before = get_versions('titles', 'users')
+        output = import_csv(only=['review', 'comments'], truncate=True)
+        assert 'Очищены таблицы' in output
+        assert counts() == loaded
+        title = Title.objects.filter(reviews__isnull=False).first()
+        assert title.score_count == title.reviews.count(), (
+            'Проверьте пересчёт рейтинга после очистки и загрузки')
+        after = get_versions('titles', 'users')
+        assert all(new != old for new, old in zip(after, before)), (
+            'Проверьте, что версии кэша сбрасываются после импорта')
+
+    def test_truncate_refused_with_dependent_rows(self):
+        import_csv()
+        loaded = counts()
+        with pytest.raises(CommandError, match='reviews_review'):
+            import_csv(only=['users'], truncate=True)
+        assert counts() == loaded, (
+            'Проверьте, что --only users не удаляет отзывы и комментарии')
@@ -0,0 +1,90 @@
+from base64 import b64encode
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reviews.models import Review
+from titles.models import Title
+from users.models import CustomUser
+
+
+def create_reviews(count):
+    """Отзывы, у части которых совпадает pub_date."""
+    title = Title.objects.create(name='Произведение', year=2000)
+    now = timezone.now()
+    for i in range(count):
+        author = CustomUser.objects.create(
+            username=f'keyset{i}', email=f'keyset{i}@yamdb.fake')
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5)
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=now + timedelta(minutes=i // 3))
+    return title, list(Review.objects.filter(title=title).order_by(
+        'pub_date', 'pk').values_list('pk', flat=True))
+
+
+def walk(client, url, link):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert 'count' not in response.data
+        pages.append([item['id'] for item in response.data['results']])
+        url = response.data[link]
+    return pages
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_forward_and_back(self):
+        title, ids = create_reviews(7)
+        client = APIClient()
+        url = (f'/api/v1/titles/{title.pk}/reviews/'
+               f'?pagination=cursor&page_size=2')
+        pages = walk(client, url, 'next')
+        assert pages == [ids[0:2], ids[2:4], ids[4:6], ids[6:7]], (
+            'Проверьте порядок по (pub_date, id) при равных pub_date')
+        last = client.get(url)
+        while last.data['next']:
+            last = client.get(last.data['next'])
+        back = walk(client, last.data['previous'], 'previous')
+        assert back == [ids[4:6], ids[2:4], ids[0:2]], (
+            'Проверьте переход к предыдущим страницам')
+        assert client.get(url).data['previous'] is None
+
+    def test_author_feed(self):
+        title, ids = create_reviews(4)
+        author = Review.objects.get(pk=ids[0]).author
+        response = APIClient().get(
+            f'/api/v1/users/{author.username}/reviews/?page_size=1')
+        assert response.status_code == 200
+        assert [item['id'] for item in response.data['results']] == [ids[0]]
+        assert response.data['next'] is None
+
+    @pytest.mark.parametrize('cursor', [
+        'не base64',
+        b64encode(b'p=2021-01-01T00:00:00&i=x').decode(),
+        b64encode(b'p=not-a-date&i=1').decode(),
+        b64encode(b'i=1').decode(),
+    ])
+    def test_invalid_cursor(self, cursor):
+        title, _ = create_reviews(1)
+        response = APIClient().get(
+            f'/api/v1/titles/{title.pk}/reviews/', {'cursor': cursor})
+        assert response.status_code == 404
+        assert response.data['detail'] == 'Неверный курсор.'
+
+    def test_ordering_rejected(self):
+        title, _ = create_reviews(1)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = APIClient().get(
+            url, {'pagination': 'cursor', 'ordering': '-score'})
+        assert response.status_code == 400, (
+            'Проверьте, что ordering не игнорируется молча '
+            'в режиме курсора')
+        assert 'ordering' in response.data
+        response = APIClient().get(url, {'ordering': '-score'})
+        assert response.status_code == 200
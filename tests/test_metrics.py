@@ -0,0 +1,125 @@
+import json
+import os
+import subprocess
+import threading
+from unittest import mock
+
+import pytest
+from django.test import Client
+
+from api.metrics import EXITED_FILE, RequestState, process_metrics
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    process_metrics.pid = None
+    yield tmp_path
+    process_metrics.pid = None
+
+
+def exited_pid():
+    process = subprocess.Popen(['true'])
+    process.wait()
+    return process.pid
+
+
+def write_exited_snapshot(metrics_dir, count, hits):
+    path = metrics_dir / f'metrics-{exited_pid()}-1.json'
+    path.write_text(json.dumps({
+        'requests': [['api:genres-list', 'GET', 200, count]],
+        'latency': [['api:genres-list', 'GET', [count] + [0] * 11 + [0.5]]],
+        'totals': [['db_queries_total', 'api:genres-list', 'GET', count]],
+        'cache': {'hits': hits, 'misses': 0},
+    }))
+    return path
+
+
+def scrape():
+    response = Client().get('/metrics')
+    assert response.status_code == 200
+    return response.content.decode().splitlines()
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_text_output(self, metrics_dir):
+        client = Client()
+        for _ in range(2):
+            assert client.get('/api/v1/categories/').status_code == 200
+        assert client.get('/api/v1/titles/0/').status_code == 404
+        lines = scrape()
+        assert '# TYPE yamdb_http_requests_total counter' in lines
+        assert ('yamdb_http_requests_total{route="api:categories-list",'
+                'method="GET",status="200"} 2') in lines
+        assert ('yamdb_http_requests_total{route="api:titles-detail",'
+                'method="GET",status="404"} 1') in lines
+        assert ('yamdb_http_request_duration_seconds_count'
+                '{route="api:categories-list",method="GET"} 2') in lines
+        assert ('yamdb_http_request_duration_seconds_bucket'
+                '{route="api:categories-list",method="GET",le="+Inf"} 2'
+                ) in lines
+        assert any(
+            line.startswith('yamdb_db_queries_total'
+                            '{route="api:categories-list",method="GET"} ')
+            for line in lines)
+        assert '# TYPE yamdb_api_cache_hits_total counter' in lines
+
+    @mock.patch('api.metrics.get_stats',
+                return_value={'hits': 0, 'misses': 0})
+    def test_exited_processes_are_merged(self, get_stats, metrics_dir):
+        first = write_exited_snapshot(metrics_dir, 3, 1)
+        second = write_exited_snapshot(metrics_dir, 4, 2)
+        lines = scrape()
+        assert ('yamdb_http_requests_total{route="api:genres-list",'
+                'method="GET",status="200"} 7') in lines
+        assert 'yamdb_api_cache_hits_total 3' in lines
+        assert not first.exists() and not second.exists(), (
+            'Проверьте, что файлы завершившихся процессов удаляются')
+        assert (metrics_dir / EXITED_FILE).exists()
+        write_exited_snapshot(metrics_dir, 1, 0)
+        lines = scrape()
+        assert ('yamdb_http_requests_total{route="api:genres-list",'
+                'method="GET",status="200"} 8') in lines
+        snapshots = sorted(
+            name for name in os.listdir(metrics_dir)
+            if name.endswith('.json'))
+        assert snapshots == sorted([
+            EXITED_FILE, os.path.basename(process_metrics.path)]), (
+            'Проверьте, что число файлов метрик не растёт')
+
+
+def test_concurrent_flushes(metrics_dir, settings):
+    settings.METRICS_FLUSH_INTERVAL = 0
+    errors = []
+
+    def observe():
+        try:
+            for _ in range(300):
+                process_metrics.observe(
+                    'api:titles-list', 'GET', 200, 0.01, RequestState(), 10)
+                process_metrics.flush()
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=observe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [], 'Проверьте параллельную запись снимков метрик'
+    assert os.listdir(metrics_dir) == [
+        os.path.basename(process_metrics.path)], (
+        'Проверьте, что временные файлы не остаются')
+    process_metrics.flush()
+    data = json.loads((metrics_dir / os.listdir(metrics_dir)[0]).read_text())
+    assert data['requests'] == [['api:titles-list', 'GET', 200, 1200]]
+
+
+def test_flush_error_does_not_fail_request(metrics_dir, settings):
+    settings.METRICS_FLUSH_INTERVAL = 0
+    with mock.patch('api.metrics.write_snapshot',
+                    side_effect=OSError('Нет места на диске')):
+        process_metrics.observe(
+            'api:titles-list', 'GET', 200, 0.01, RequestState(), 10)
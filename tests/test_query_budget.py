@@ -0,0 +1,111 @@
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from api import registry
+from api.registry import catalog_registry
+
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title
+from users.models import CustomUser
+
+
+def create_catalog(size):
+    """Каталог из size произведений с отзывами и комментариями к первому."""
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(size)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(size)
+    ]
+    users = [
+        CustomUser.objects.create(username=f'user{i}',
+                                  email=f'user{i}@yamdb.fake')
+        for i in range(size)
+    ]
+    titles = []
+    for i in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=categories[i])
+        title.genre.set(genres[:2])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=5)
+        for user in users
+    ]
+    for user in users:
+        Comment.objects.create(
+            review=reviews[0], author=user, text='Комментарий')
+    return titles[0], reviews[0]
+
+
+def admin_client():
+    admin = CustomUser.objects.create(
+        username='budget_admin', email='budget_admin@yamdb.fake',
+        role=CustomUser.ADMIN)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+ROUTES = (
+    # (описание, функция построения url, бюджет запросов, нужен ли админ)
+    ('titles list', lambda title, review: '/api/v1/titles/', 3, False),
+    ('titles top',
+     lambda title, review: '/api/v1/titles/top/?genre=genre-0', 2, False),
+    ('title detail',
+     lambda title, review: f'/api/v1/titles/{title.pk}/', 2, False),
+    ('reviews list',
+     lambda title, review: f'/api/v1/titles/{title.pk}/reviews/', 3, False),
+    ('review detail',
+     lambda title, review:
+     f'/api/v1/titles/{title.pk}/reviews/{review.pk}/', 2, False),
+    ('comments list',
+     lambda title, review:
+     f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/', 3, False),
+    ('genres list', lambda title, review: '/api/v1/genres/', 2, False),
+    ('categories list',
+     lambda title, review: '/api/v1/categories/', 2, False),
+    ('users list', lambda title, review: '/api/v1/users/', 2, True),
+    ('author reviews',
+     lambda title, review: '/api/v1/users/user0/reviews/', 2, False),
+    ('author comments',
+     lambda title, review: '/api/v1/users/user0/comments/', 2, False),
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('size', (1, 25))
+    @pytest.mark.parametrize(
+        'name, url, budget, needs_admin', ROUTES,
+        ids=[route[0] for route in ROUTES])
+    def test_query_budget(self, django_assert_num_queries, size,
+                          name, url, budget, needs_admin):
+        title, review = create_catalog(size)
+        client = admin_client() if needs_admin else APIClient()
+        # Справочник категорий и жанров загружается один раз на процесс.
+        catalog_registry.ensure_current()
+        with django_assert_num_queries(budget):
+            response = client.get(url(title, review))
+        assert response.status_code == 200, (
+            f'Проверьте, что {name} доступен по адресу {url(title, review)}'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_registry_checked_once_per_request():
+    create_catalog(25)
+    catalog_registry.ensure_current()
+    with mock.patch('api.registry.get_versions',
+                    wraps=registry.get_versions) as get_versions:
+        response = APIClient().get('/api/v1/titles/')
+    assert response.status_code == 200
+    assert len(response.data['results']) == 25
+    assert get_versions.call_count == 1, (
+        'Проверьте, что версия справочника проверяется один раз на запрос')
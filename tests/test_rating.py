@@ -0,0 +1,98 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review
+from titles.models import Title, TitleStats
+from users.models import CustomUser
+
+
+def create_user(name):
+    return CustomUser.objects.create(
+        username=name, email=f'{name}@yamdb.fake')
+
+
+def assert_rating(title, score_sum, score_count, rating):
+    title.refresh_from_db()
+    assert (title.score_sum, title.score_count, title.rating) == (
+        score_sum, score_count, rating)
+    stats = TitleStats.objects.get(title=title)
+    assert stats.count == score_count
+    assert sum(
+        score * total for score, total in stats.histogram.items()
+    ) == score_sum, 'Проверьте, что гистограмма совпадает с рейтингом'
+
+
+@pytest.mark.django_db
+class TestRatingDenormalization:
+
+    def test_create_and_score_change(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        assert_rating(title, 0, 0, None)
+        review = Review.objects.create(
+            title=title, author=create_user('first'), text='О', score=4)
+        Review.objects.create(
+            title=title, author=create_user('second'), text='О', score=9)
+        assert_rating(title, 13, 2, 6.5)
+        review.score = 10
+        review.save()
+        assert_rating(title, 19, 2, 9.5)
+        review.save()
+        assert_rating(title, 19, 2, 9.5)
+
+    def test_review_moved_to_other_title(self):
+        source, target = (
+            Title.objects.create(name=name, year=2000)
+            for name in ('Откуда', 'Куда'))
+        review = Review.objects.create(
+            title=source, author=create_user('mover'), text='О', score=6)
+        review.title = target
+        review.score = 2
+        review.save()
+        assert_rating(source, 0, 0, None)
+        assert_rating(target, 2, 1, 2.0)
+
+    def test_queryset_delete(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        for i, score in enumerate((3, 5, 10)):
+            Review.objects.create(
+                title=title, author=create_user(f'user{i}'),
+                text='О', score=score)
+        Review.objects.filter(score__lt=10).delete()
+        assert_rating(title, 10, 1, 10.0)
+        Review.objects.all().delete()
+        assert_rating(title, 0, 0, None)
+
+    def test_user_cascade(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        leaving = create_user('leaving')
+        Review.objects.create(title=title, author=leaving, text='О', score=1)
+        Review.objects.create(
+            title=title, author=create_user('staying'), text='О', score=7)
+        leaving.delete()
+        assert_rating(title, 7, 1, 7.0)
+
+    def test_title_cascade(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        Review.objects.create(
+            title=title, author=create_user('author'), text='О', score=8)
+        title.delete()
+        assert not Review.objects.exists()
+        assert not TitleStats.objects.exists(), (
+            'Проверьте, что статистика удалённого произведения '
+            'не создаётся заново')
+
+    def test_recalculate_ratings_fixes_drift(self):
+        title, other = (
+            Title.objects.create(name=name, year=2000)
+            for name in ('Произведение', 'Другое'))
+        for i, score in enumerate((4, 8)):
+            Review.objects.create(
+                title=title, author=create_user(f'user{i}'),
+                text='О', score=score)
+        Title.objects.filter(pk=title.pk).update(
+            score_sum=100, score_count=3, rating=33.3)
+        Title.objects.filter(pk=other.pk).update(score_count=1, rating=5.0)
+        TitleStats.objects.filter(title=title).update(count=9, score_4=8)
+        call_command('recalculate_ratings')
+        assert_rating(title, 12, 2, 6.0)
+        assert_rating(other, 0, 0, None)
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from api.cache import bump_version, get_versions
+from reviews.models import Review
+from titles.models import Title
+from users.models import CustomUser
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_titles_list_invalidated_by_review(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        author = CustomUser.objects.create(
+            username='author', email='author@yamdb.fake')
+        client = APIClient()
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'HIT'
+        assert response.data['results'][0]['rating'] is None
+        Review.objects.create(title=title, author=author, text='О', score=7)
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.data['results'][0]['rating'] == 7
+
+    def test_versions_bumped_after_commit(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        author = CustomUser.objects.create(
+            username='author', email='author@yamdb.fake')
+        before = get_versions('titles', f'reviews:{title.pk}')
+        with transaction.atomic():
+            Review.objects.create(
+                title=title, author=author, text='О', score=7)
+            assert get_versions('titles', f'reviews:{title.pk}') == before, (
+                'Проверьте, что версии увеличиваются после фиксации')
+        after = get_versions('titles', f'reviews:{title.pk}')
+        assert all(new > old for new, old in zip(after, before))
+
+
+def test_concurrent_bumps_on_file_cache(settings, tmp_path):
+    settings.CACHES = {**settings.CACHES, 'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    first, = get_versions('bumped')
+    errors = []
+
+    def bump():
+        try:
+            for _ in range(50):
+                bump_version('bumped')
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert get_versions('bumped') == [first + 400], (
+        'Проверьте, что параллельные сбросы версии не теряются')
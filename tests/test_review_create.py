@@ -0,0 +1,43 @@
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError
+from rest_framework.test import APIClient
+
+from api.serializers import ReviewSerializer
+from reviews.models import Review
+from titles.models import Title
+from users.models import CustomUser
+
+
+def author_client():
+    author = CustomUser.objects.create(
+        username='reviewer', email='reviewer@yamdb.fake')
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def test_duplicate_review(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        client = author_client()
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        data = {'text': 'Отзыв', 'score': 7}
+        assert client.post(url, data).status_code == 201
+        response = client.post(url, data)
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': [
+            'Вы можете оставить только один отзыв на произведение!']}
+        assert Review.objects.filter(title=title).count() == 1
+
+    def test_other_integrity_errors_are_not_masked(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        client = author_client()
+        with mock.patch.object(ReviewSerializer, 'save',
+                               side_effect=IntegrityError('NOT NULL')):
+            with pytest.raises(IntegrityError):
+                client.post(f'/api/v1/titles/{title.pk}/reviews/',
+                            {'text': 'Отзыв', 'score': 7})
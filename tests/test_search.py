@@ -0,0 +1,68 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.cache import bump_version
+from api.search import SEARCH_RESOURCE, PostgresSearchBackend, title_index
+from titles.models import Title
+
+NAMES = ('Властелин колец', 'Война и мир', 'Братство кольца',
+         'Мир Дикого Запада')
+
+
+def lookups(node):
+    """Имена всех lookup в условии WHERE запроса."""
+    for child in node.children:
+        if hasattr(child, 'children'):
+            yield from lookups(child)
+        else:
+            yield child.lookup_name
+
+
+@pytest.fixture
+def fresh_index():
+    """БД очищается между тестами без сигналов: индекс строится заново."""
+    bump_version(SEARCH_RESOURCE)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('fresh_index')
+class TestInMemorySearch:
+
+    def create_titles(self):
+        return {name: Title.objects.create(name=name, year=2000).pk
+                for name in NAMES}
+
+    def test_ranking_and_typos(self):
+        ids = self.create_titles()
+        assert title_index.search('властелин колец', 0.5, 10)[0] == (
+            ids['Властелин колец'])
+        assert title_index.search('властилин калец', 0.5, 10)[0] == (
+            ids['Властелин колец']), 'Проверьте поиск с опечатками'
+        assert title_index.search('мир', 0.5, 10) == [
+            ids['Война и мир'], ids['Мир Дикого Запада']], (
+            'При равном покрытии выше название, больше похожее на запрос')
+        assert title_index.search('гарри поттер', 0.5, 10) == []
+
+    def test_index_follows_title_changes(self):
+        ids = self.create_titles()
+        title = Title.objects.get(pk=ids['Война и мир'])
+        title.name = 'Анна Каренина'
+        title.save()
+        Title.objects.filter(pk=ids['Братство кольца']).delete()
+        assert title_index.search('война и мир', 0.5, 10) == []
+        assert title_index.search('анна каренина', 0.5, 10) == [title.pk]
+        assert ids['Братство кольца'] not in title_index.search(
+            'кольца', 0.5, 10)
+
+    def test_name_filter_orders_by_relevance(self):
+        ids = self.create_titles()
+        response = APIClient().get('/api/v1/titles/?name=властелин')
+        assert [item['id'] for item in response.data['results']] == [
+            ids['Властелин колец']]
+
+
+def test_postgres_search_uses_indexed_conditions():
+    queryset = PostgresSearchBackend().search(
+        Title.objects.all(), 'властелин')
+    assert set(lookups(queryset.query.where)) == {'exact', 'trigram_similar'}, (
+        'Условия поиска должны обслуживаться GIN-индексами из titles.0003')
@@ -0,0 +1,153 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.management.commands.send_outbox import Command
+from users.models import OutgoingEmail
+
+
+class FailingEmailBackend(EmailBackend):
+    """Письма на адреса с fail@ не отправляются."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any('fail@' in address for address in message.to):
+                raise ConnectionError('Сервер недоступен')
+        return super().send_messages(messages)
+
+
+class ClosedEmailBackend(EmailBackend):
+    """Соединение с сервером не открывается."""
+
+    def open(self):
+        raise ConnectionRefusedError('Соединение отклонено')
+
+
+def queue_email(recipient):
+    return OutgoingEmail.objects.create(
+        recipient=recipient, subject='Код', body='Текст',
+        from_email='yamdb@yamdb.fake')
+
+
+def send_outbox(**options):
+    out = StringIO()
+    call_command('send_outbox', stdout=out, workers=2, backoff=30,
+                 max_attempts=3, **options)
+    return out.getvalue()
+
+
+def make_due(email):
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+
+@pytest.fixture(autouse=True)
+def failing_email_backend(settings):
+    settings.EMAIL_BACKEND = 'tests.test_send_outbox.FailingEmailBackend'
+
+
+@pytest.mark.django_db
+class TestSendOutbox:
+
+    def test_sent(self):
+        email = queue_email('ok@yamdb.fake')
+        output = send_outbox()
+        assert 'Отправлено: 1, ошибок: 0, в dead: 0' in output
+        email.refresh_from_db()
+        assert (email.status, email.attempts, email.last_error) == (
+            OutgoingEmail.SENT, 1, '')
+        assert email.body == '', (
+            'Проверьте, что код подтверждения стирается после отправки')
+        assert mail.outbox[0].body == 'Текст'
+        assert email.sent_at is not None
+        assert [message.to for message in mail.outbox] == [
+            ['ok@yamdb.fake']]
+        send_outbox()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно')
+
+    def test_retry_with_backoff_and_dead_letter(self):
+        email = queue_email('fail@yamdb.fake')
+        queue_email('ok@yamdb.fake')
+        started = timezone.now()
+        assert 'Отправлено: 1, ошибок: 1' in send_outbox()
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutgoingEmail.PENDING, 1)
+        assert 'Сервер недоступен' in email.last_error
+        assert email.next_attempt_at >= started + timedelta(seconds=30)
+        send_outbox()
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Проверьте, что письмо не повторяется до срока следующей попытки')
+        make_due(email)
+        started = timezone.now()
+        send_outbox()
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutgoingEmail.PENDING, 2)
+        assert email.body == 'Текст', 'Текст нужен для повторной попытки'
+        assert email.next_attempt_at >= started + timedelta(seconds=60), (
+            'Проверьте, что задержка повтора удваивается')
+        make_due(email)
+        assert 'в dead: 1' in send_outbox()
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutgoingEmail.DEAD, 3)
+        assert email.body == ''
+        make_due(email)
+        send_outbox()
+        email.refresh_from_db()
+        assert email.attempts == 3, 'Письмо в dead больше не отправляется'
+
+    def test_connection_error(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_send_outbox.ClosedEmailBackend'
+        emails = [queue_email(f'user{i}@yamdb.fake') for i in range(3)]
+        assert 'Отправлено: 0, ошибок: 3' in send_outbox()
+        for email in emails:
+            email.refresh_from_db()
+            assert (email.status, email.attempts) == (
+                OutgoingEmail.PENDING, 1)
+            assert 'Соединение отклонено' in email.last_error
+
+    def test_lease(self):
+        email = queue_email('ok@yamdb.fake')
+        command = Command()
+        command.options = {'batch_size': 10, 'lease': 300}
+        started = timezone.now()
+        assert [item['pk'] for item in command.claim_batch()] == [email.pk]
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.next_attempt_at >= started + timedelta(seconds=300)
+        assert command.claim_batch() == [], (
+            'Проверьте, что забранное письмо скрыто от других обработчиков')
+        send_outbox()
+        assert not mail.outbox
+        make_due(email)
+        send_outbox()
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.SENT, (
+            'Проверьте, что письмо возвращается в очередь после аренды')
+        assert email.attempts == 1
+
+    def test_batch_size(self):
+        for i in range(5):
+            queue_email(f'user{i}@yamdb.fake')
+        assert 'Отправлено: 2' in send_outbox(batch_size=2)
+        assert OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING).count() == 3
+
+
+@pytest.mark.django_db
+def test_admin_hides_body(admin_client):
+    email = queue_email('ok@yamdb.fake')
+    email.body = 'Код подтверждения: secret-code'
+    email.save()
+    for url in ('/admin/users/outgoingemail/',
+                f'/admin/users/outgoingemail/{email.pk}/change/'):
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert 'secret-code' not in response.content.decode(), (
+            'Проверьте, что текст письма не виден в админке')
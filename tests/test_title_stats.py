@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Review
+from titles.models import Title, TitleStats
+from users.models import CustomUser
+
+
+def create_reviews(title, scores):
+    reviews = []
+    for i, score in enumerate(scores):
+        author = CustomUser.objects.create(
+            username=f'stats{i}', email=f'stats{i}@yamdb.fake')
+        reviews.append(Review.objects.create(
+            title=title, author=author, text='Отзыв', score=score))
+    return reviews
+
+
+def get_stats(title):
+    response = APIClient().get(f'/api/v1/titles/{title.pk}/stats/')
+    assert response.status_code == 200
+    return response.data
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_histogram_and_median(self):
+        title = Title.objects.create(name='Статистика', year=2000)
+        create_reviews(title, [3, 8, 8, 10])
+        data = get_stats(title)
+        assert data['count'] == 4
+        assert data['rating'] == 7.25
+        assert data['median'] == 8
+        assert data['histogram']['8'] == 2
+        assert sum(data['histogram'].values()) == 4
+
+    def test_stats_follow_score_change_and_delete(self):
+        title = Title.objects.create(name='Статистика', year=2000)
+        reviews = create_reviews(title, [2, 4, 9])
+        assert get_stats(title)['median'] == 4
+        reviews[0].score = 10
+        reviews[0].save()
+        data = get_stats(title)
+        assert (data['histogram']['2'], data['histogram']['10']) == (0, 1), (
+            'Проверьте, что гистограмма учитывает изменение оценки')
+        assert data['median'] == 9
+        reviews[1].delete()
+        data = get_stats(title)
+        assert data['count'] == 2
+        assert data['histogram']['4'] == 0
+        assert data['median'] == 9.5, (
+            'Проверьте, что медиана учитывает удаление отзыва')
+        Review.objects.filter(title=title).delete()
+        data = get_stats(title)
+        assert data['count'] == 0
+        assert data['median'] is None
+
+    def test_stats_row_created_with_title(self):
+        title = Title.objects.create(name='Статистика', year=2000)
+        assert TitleStats.objects.filter(title=title, count=0).exists(), (
+            'Проверьте, что статистика создаётся вместе с произведением')
+        create_reviews(title, [5, 7])
+        assert (get_stats(title)['count'], get_stats(title)['median']) == (
+            2, 6)
+
+    def test_stats_request_is_read_only(self):
+        title = Title.objects.create(name='Статистика', year=2000)
+        TitleStats.objects.filter(title=title).delete()
+        with CaptureQueriesContext(connection) as queries:
+            data = get_stats(title)
+        assert (data['count'], data['median']) == (0, None)
+        assert all(query['sql'].lstrip().upper().startswith('SELECT')
+                   for query in queries), (
+            'Проверьте, что запрос статистики не пишет в БД')
+        assert not TitleStats.objects.filter(title=title).exists()
+
+    @pytest.mark.parametrize('pk', ['0', '999999', 'abc'])
+    def test_unknown_title(self, pk):
+        response = APIClient().get(f'/api/v1/titles/{pk}/stats/')
+        assert response.status_code == 404, (
+            'Проверьте, что статистика несуществующего произведения - 404')
@@ -0,0 +1,61 @@
+import pytest
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from reviews.models import Review
+from titles.models import Category, Title
+from users.models import CustomUser
+
+
+def create_rated_titles(scores):
+    """Произведения с отзывами: scores - список оценок каждого."""
+    category = Category.objects.create(name='Книги', slug='books')
+    users = [
+        CustomUser.objects.create(username=f'top{i}',
+                                  email=f'top{i}@yamdb.fake')
+        for i in range(max(len(title_scores) for title_scores in scores))
+    ]
+    titles = []
+    for i, title_scores in enumerate(scores):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=category)
+        for user, score in zip(users, title_scores):
+            Review.objects.create(
+                title=title, author=user, text='Отзыв', score=score)
+        titles.append(title)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTopTitles:
+
+    def test_top_ranks_and_ties(self):
+        titles = create_rated_titles([[8], [9, 7], [10], [], [8, 8]])
+        response = APIClient().get('/api/v1/titles/top/?category=books')
+        assert response.status_code == 200
+        assert [(item['id'], item['rank']) for item in response.data] == [
+            (titles[2].pk, 1), (titles[4].pk, 2), (titles[1].pk, 2),
+            (titles[0].pk, 2),
+        ], 'Проверьте порядок и общие места при равном рейтинге'
+        response = APIClient().get(
+            '/api/v1/titles/top/?ties=newest&min_reviews=2&limit=1')
+        assert [item['id'] for item in response.data] == [titles[4].pk]
+
+    def test_top_follows_review_changes(self):
+        titles = create_rated_titles([[6], [5]])
+        client = APIClient()
+        assert client.get('/api/v1/titles/top/').data[0]['id'] == (
+            titles[0].pk)
+        review = Review.objects.get(title=titles[1])
+        review.score = 10
+        review.save()
+        assert client.get('/api/v1/titles/top/').data[0]['id'] == (
+            titles[1].pk), 'Проверьте, что рейтинг обновляется с отзывами'
+
+    @override_settings(TOP_TITLES_MAX_LIMIT=2)
+    def test_top_limit(self):
+        create_rated_titles([[1], [2], [3]])
+        response = APIClient().get('/api/v1/titles/top/?limit=50')
+        assert len(response.data) == 2
+        response = APIClient().get('/api/v1/titles/top/?ties=unknown')
+        assert response.status_code == 400
@@ -0,0 +1,104 @@
+import pytest
+from django.test import Client
+from rest_framework.test import APIClient
+
+from api.authentication import get_token_for_user, user_cache
+from users.models import CustomUser
+
+
+def create_user(username, role=CustomUser.USER, **kwargs):
+    return CustomUser.objects.create(
+        username=username, email=f'{username}@yamdb.fake', role=role,
+        **kwargs)
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_token_for_user(user)}')
+    return client
+
+
+def superuser_client():
+    superuser = create_user('root', is_staff=True, is_superuser=True)
+    client = Client()
+    client.force_login(superuser)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUserCacheInvalidation:
+
+    def test_role_demotion_via_api(self):
+        admin = create_user('admin', CustomUser.ADMIN)
+        client = token_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        owner = token_client(create_user('owner', CustomUser.ADMIN))
+        response = owner.patch(
+            '/api/v1/users/admin/', {'role': CustomUser.USER})
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что понижение роли действует со следующего запроса')
+
+    def test_deactivation_and_deletion_via_api(self):
+        owner = token_client(create_user('owner', CustomUser.ADMIN))
+        client = token_client(create_user('reader'))
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user = CustomUser.objects.get(username='reader')
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что отключённый пользователь не проходит '
+            'аутентификацию')
+        assert owner.delete('/api/v1/users/reader/').status_code == 204
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что удалённый пользователь не проходит '
+            'аутентификацию')
+
+    def test_role_demotion_via_admin(self):
+        moderator = create_user('moderator', CustomUser.ADMIN)
+        client = token_client(moderator)
+        assert client.get('/api/v1/users/').status_code == 200
+        response = superuser_client().post(
+            '/admin/users/customuser/?q=moderator', {
+                'form-TOTAL_FORMS': '1',
+                'form-INITIAL_FORMS': '1',
+                'form-0-id': str(moderator.pk),
+                'form-0-role': CustomUser.MODERATOR,
+                '_save': 'Сохранить',
+            })
+        assert response.status_code == 302
+        moderator.refresh_from_db()
+        assert moderator.role == CustomUser.MODERATOR
+        assert client.get('/api/v1/users/').status_code == 403
+
+    def test_deletion_via_admin(self):
+        user = create_user('reader')
+        client = token_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        response = superuser_client().post(
+            f'/admin/users/customuser/{user.pk}/delete/', {'post': 'yes'})
+        assert response.status_code == 302
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_cache_returns_copies():
+    user = create_user('reader')
+    claims = (user.role, user.is_staff, user.is_superuser)
+    user_cache.set(user, 1, claims)
+    first = user_cache.get(user.pk, 1, claims)
+    first.bio = 'Не сохранено'
+    user.bio = 'Тоже не сохранено'
+    second = user_cache.get(user.pk, 1, claims)
+    assert first is not second
+    assert second.bio is None, (
+        'Проверьте, что изменения экземпляра в одном запросе '
+        'не видны другим запросам через кэш')